@@ -3,6 +3,7 @@ from fingerJointBoxMaker.constrains import Constraint
 from fingerJointBoxMaker.geometry import Line, Path, Orientation, Plane
 from fingerJointBoxMaker.boxes.comon import Box
 from fingerJointBoxMaker.boxes.simple_box import SimpleBox, SimpleBoxStraightTop
+from fingerJointBoxMaker.boxes.spec import BoxSpec, SpecBox
 from fingerJointBoxMaker.constraints_impl import *
 
 print_msg_f = None
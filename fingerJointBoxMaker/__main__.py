@@ -3,7 +3,8 @@ import os
 import sys
 from typing import Protocol, TextIO
 from fingerJointBoxMaker.boxes.stackable_box import stackable_ns
-from fingerJointBoxMaker.export.svgwriter import BoxDrawing
+from fingerJointBoxMaker.export.svgwriter import BoxDrawing, StreamingBoxDrawing
+from fingerJointBoxMaker.export.dxfwriter import DxfDrawing
 
 
 class SvgSaver(Protocol):
@@ -14,13 +15,24 @@ class SvgSaver(Protocol):
 
 def main(ns:argparse.Namespace):
     drawing: BoxDrawing = ns.main(ns)
-    drawing.save(ns.output)
+    if isinstance(ns.output, str) and ns.output.endswith(".dxf"):
+        DxfDrawing.from_drawing(drawing, construction=ns.dxf_construction).save(ns.output)
+        return
+    # streamed part by part, also through the compressor for svgz output
+    drawing = StreamingBoxDrawing.from_drawing(drawing, precision=ns.precision, dedup=ns.dedup)
+    drawing.save(ns.output, minify=ns.minify, compress=ns.compress)
 
 def build_parser():
     parent = argparse.ArgumentParser(
         prog="FingerJointBoxMaker",
     )
     parent.add_argument("-o", "--output",  help="Save output csv in path. Default standard out.", required=False, default=sys.stdout)
+    parent.add_argument("--minify", action="store_true", help="write svg without indentation")
+    parent.add_argument("--precision", type=int, default=None, help="write compact svg path data with at most this number of decimals")
+    parent.add_argument("--dxf-construction", dest="dxf_construction", choices=DxfDrawing.CONSTRUCTION_MODES, default="layer",
+                        help="construction lines of dxf output (file ending with .dxf) on a separate layer or only as pen-up moves")
+    parent.add_argument("--dedup", action="store_true", help="write translated copies of a part once and place them with <use>")
+    parent.add_argument("--compress", action="store_true", default=None, help="gzip compressed svg (svgz). Default for output files ending with .svgz")
 
     #equal finger/notch setup
     parent.add_argument("--bound", type=float, help="width length height  (space separated)", nargs=3)
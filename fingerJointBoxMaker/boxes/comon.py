@@ -1,12 +1,17 @@
 
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor
+import contextvars
+import logging
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Tuple
+import numpy as np
+from numpy.typing import ArrayLike
 from fingerJointBoxMaker.constraints_impl import DimenssionConstraint, EqualConstraint, HorizontalConstrain, OriginLockConstraint, PerpendicularConstraint, VerticalConstrain
-from fingerJointBoxMaker.dimension import AbsDimHashKey, Dim
+from fingerJointBoxMaker.dimension import AbsDimHashKey, Dim, numeric_mode
 
-from fingerJointBoxMaker.face import Face
-from fingerJointBoxMaker.geometry import Line, Path
+from fingerJointBoxMaker.face import Artifact, ArtifactConsumer, ConstraintReduction, Face
+from fingerJointBoxMaker.geometry import ConstraintTable, Line, Orientation, Path
 
 @dataclass
 class Box(ABC):
@@ -23,20 +28,47 @@ class Box(ABC):
     def init_constrains(self):
         pass
     
-    def build_face(self, face: Face) -> Path:
-        p: Path = face.build_path()
+    def build_face(self, face: Face, numeric: bool = False, artifacts: Artifact = Artifact.ALL) -> Path:
+        """Build path of `face` with the requested `artifacts`. If `numeric` is set, or `Artifact.DIM_NAMES` 
+        is not requested, dimensions are build without names (see `numeric_mode`)."""
+        with numeric_mode(numeric or Artifact.DIM_NAMES not in artifacts):
+            p: Path = face.build_path(artifacts=artifacts)
         return p
     
-    def build(self) -> List[Path]:
-        return [self.build_face(f) for f in self.faces]
+    def build(self, numeric: bool = False, artifacts: Artifact = Artifact.ALL, executor: Executor|None = None) -> List[Path]:
+        """Build paths of all faces in face order. Faces are independent, thus they can be built 
+        concurrently on a thread or process pool given as `executor`. Without executor they are built serially.
+        Note: with a process pool, state set on faces by constraint providers (e.g. `Face.constraint_reduction`)
+        and the face build cache stay in the worker processes."""
+        if executor is None:
+            return [self.build_face(f, numeric=numeric, artifacts=artifacts) for f in self.faces]
+        if isinstance(executor, ProcessPoolExecutor):
+            # contexts can not be pickled, the numeric mode is passed on as argument
+            futures = [executor.submit(self.build_face, f, numeric=numeric, artifacts=artifacts) for f in self.faces]
+        else:
+            # a thread pool does not copy the caller's context (e.g. the numeric mode), each task runs in its own copy
+            futures = [
+                executor.submit(contextvars.copy_context().run, self.build_face, f, numeric=numeric, artifacts=artifacts)
+                for f in self.faces]
+        return [f.result() for f in futures]
+
+    def with_minimized_constraints(self) -> "Box":
+        """Append `minimize_constraints` as last constraint provider of each face, e.g. before handing 
+        the sketches to a CAD solver."""
+        for f in self.faces:
+            if minimize_constraints not in f.constraint_providers:
+                f.constraint_providers.append(minimize_constraints)
+        return self
+
+    def build_for(self, consumer: ArtifactConsumer) -> List[Path]:
+        """Build all faces with only the artifacts required by `consumer`"""
+        return self.build(artifacts=consumer.required_artifacts)
 
 
 def add_perpendicular_constraints(path: Path, face: Face) -> Path:
     """Make all lines perpendicular to the next."""
-    for i in range(len(path.lines)-2):
-        p1 = path.lines[i+1]
-        p2 = path.lines[i+2]
-        path.append_constraint(PerpendicularConstraint(p1, p2))
+    first = np.arange(1, len(path.lines)-1)
+    path.constraints.add_many(PerpendicularConstraint, np.stack([first, first + 1], axis=1))
     return path
 
 
@@ -97,6 +129,150 @@ def add_dimension_constraint(path: Path, face: Face) -> Path:
     path.append_constraint(DimenssionConstraint(path))
     return path
 
+def count_sketch_constraints(path: Path) -> int:
+    """Number of constraints a sketch solver sees for the path: an equal constraint of n lines counts 
+    as n-1 constraints and a `DimenssionConstraint` as one per dimensioned line."""
+    count = 0
+    table = path.constraints
+    dimension = ConstraintTable.code_of(DimenssionConstraint)
+    equal = ConstraintTable.code_of(EqualConstraint)
+    lengths = np.diff(table.indptr)
+    for code, length in zip(table.codes, lengths):
+        if code == equal:
+            count += max(int(length) - 1, 0)
+        elif code == dimension:
+            count += sum(1 for d in path.lines.dims if d is not None)
+        else:
+            count += 1
+    return count
+
+
+def minimize_constraints(path: Path, face: Face) -> Path:
+    """Reduce the constraints of the path to a non-redundant set, using the known orientation of 
+    each line. Should be the last constraint provider of a face.
+
+    - perpendicular constraints are only kept between a horizontal and a vertical line and only if 
+      they link two lines not yet linked through other perpendicular constraints (no cycles)
+    - consecutive connected horizontal/vertical lines not linked yet (e.g. the first line, which 
+      `add_perpendicular_constraints` leaves out) get a perpendicular constraint
+    - lines linked by perpendicular constraints form a group in which exactly one line keeps its 
+      horizontal/vertical constraint. Groups without one get a constraint on their first line.
+    - horizontal/vertical constraints contradicting the orientation of a line are dropped
+    - equal constraints with less than two lines and duplicated constraints are dropped. Only the 
+      first line of an equal constraint keeps its dimension.
+    - if the outline is closed, the length of its last horizontal and its last vertical line follows 
+      from all other lines. They are removed from their equal constraint or lose their dimension.
+
+    For a closed outline of horizontal and vertical lines the result has as many constraint equations 
+    as the sketch has degrees of freedom. Not part of the default providers of a box, see 
+    `Box.with_minimized_constraints`.
+
+    The numbers of constraints before and after are stored in `face.constraint_reduction`.
+    """
+    before = count_sketch_constraints(path)
+    table = path.constraints
+    orientation = path.lines.orientation
+    perpendicular = ConstraintTable.code_of(PerpendicularConstraint)
+    horizontal = ConstraintTable.code_of(HorizontalConstrain)
+    vertical = ConstraintTable.code_of(VerticalConstrain)
+    equal = ConstraintTable.code_of(EqualConstraint)
+    code_of_orientation = {Orientation.Horizontal.value: horizontal, Orientation.Vertical.value: vertical}
+
+    group = list(range(len(orientation)))
+    def find(i: int) -> int:
+        while group[i] != i:
+            group[i] = group[group[i]]
+            i = group[i]
+        return i
+
+    # first pass: link lines by perpendicular constraints and collect candidates for the groups
+    rows: List[Tuple[int, Tuple[int, ...]]|None] = []
+    candidates: List[Tuple[int, int]] = [] # (row, line)
+    seen = set()
+    codes, indptr, indices = table.codes, table.indptr, table.indices
+    for row, code in enumerate(codes):
+        lines = tuple(int(i) for i in indices[indptr[row]:indptr[row+1]])
+        if code == perpendicular:
+            a, b = lines
+            if orientation[a] in code_of_orientation and orientation[b] in code_of_orientation:
+                if orientation[a] == orientation[b]:
+                    continue # parallel lines can not be perpendicular
+                if find(a) == find(b):
+                    continue # implied by the other perpendicular constraints
+                group[find(a)] = find(b)
+            lines = tuple(sorted(lines))
+        elif code in (horizontal, vertical):
+            candidates.extend((len(rows), l) for l in lines if code_of_orientation.get(orientation[l]) == code)
+            rows.append(None)
+            continue
+        elif code == equal and len(lines) < 2:
+            continue
+        if code != ConstraintTable.OBJECT:
+            if (code, lines) in seen:
+                continue
+            seen.add((code, lines))
+        rows.append((code, lines))
+
+    # link consecutive lines of the outline left out by the perpendicular constraints
+    columns = path.lines.columns()
+    outline = np.flatnonzero(~columns["construction"])
+    for a, b in zip(outline[:-1].tolist(), outline[1:].tolist()):
+        known = orientation[a] in code_of_orientation and orientation[b] in code_of_orientation
+        if b == a + 1 and known and orientation[a] != orientation[b] and columns["end"][a] == columns["start"][b] and find(a) != find(b):
+            group[find(a)] = find(b)
+            rows.append((perpendicular, (a, b)))
+
+    # second pass: one horizontal/vertical constraint per group
+    anchored = set()
+    for row, line in candidates:
+        if find(line) not in anchored:
+            anchored.add(find(line))
+            rows[row] = (code_of_orientation[orientation[line]], (line,))
+    for line, o in enumerate(orientation):
+        if o in code_of_orientation and find(line) not in anchored:
+            anchored.add(find(line))
+            rows.append((code_of_orientation[o], (line,)))
+    rows = [r for r in rows if r is not None]
+
+    # lines of an equal constraint get their length from the first line
+    for code, lines in rows:
+        if code == equal:
+            for l in lines[1:]:
+                if path.lines[l].dim is not None:
+                    path.lines[l].dim = None
+
+    # third pass: lengths implied by a closed outline
+    points = path.points
+    if len(outline) > 3 and np.all(points[columns["start"][outline[0]]] == points[columns["end"][outline[-1]]]):
+        followers = {l: r for r, (code, lines) in enumerate(rows) if code == equal for l in lines[1:]}
+        in_group = {l for code, lines in rows if code == equal for l in lines}
+        for o in code_of_orientation:
+            lines_o = [int(l) for l in outline[orientation[outline] == o]]
+            if any(l not in in_group and path.lines[l].dim is None for l in lines_o):
+                continue # a length is already left to the solver
+            for line in lines_o[::-1]:
+                if line in followers:
+                    code, lines = rows[followers[line]]
+                    rows[followers[line]] = (code, tuple(l for l in lines if l != line))
+                    break
+                if line not in in_group and path.lines[line].dim is not None:
+                    path.lines[line].dim = None
+                    break
+        rows = [(code, lines) for code, lines in rows if code != equal or len(lines) > 1]
+
+    lengths = [len(lines) for _, lines in rows]
+    path.constraints = ConstraintTable.from_rows(
+        path,
+        [code for code, _ in rows],
+        np.append(0, np.cumsum(lengths, dtype=np.intp)),
+        [l for _, lines in rows for l in lines],
+        table.objects)
+
+    face.constraint_reduction = ConstraintReduction(face.name, before, count_sketch_constraints(path))
+    logging.info(f"Face '{face.name}': removed {face.constraint_reduction.removed} of {before} constraints")
+    return path
+
+
 def max_equal_finger_configuration(length: float, max_finger: int, thickness: float = 3.0):
     if length < 3*thickness:
         raise ValueError(f"length must be at least 3 times the thickness='{thickness}', got {length}")
@@ -107,4 +283,28 @@ def max_equal_finger_configuration(length: float, max_finger: int, thickness: fl
             return x, int((N+1)/2)
         N -= 1
     raise ValueError(f"length must be at least 3 times the thickness='{thickness}', got {length}")
-    
\ No newline at end of file
+
+
+def max_equal_finger_configurations(length: ArrayLike, max_finger: ArrayLike, thickness: ArrayLike = 3.0) -> Tuple[np.ma.MaskedArray, np.ma.MaskedArray]:
+    """Vectorized `max_equal_finger_configuration` for broadcastable arrays of lengths, finger limits and thicknesses.
+    The number of segments `N` is the largest `N <= 2*max_finger-1` with `length/N >= thickness`, which is found in 
+    closed form instead of decrementing `N`. Returns the finger/notch size and the finger count. Configurations for 
+    which `max_equal_finger_configuration` raises (and non-positive thicknesses) are masked.
+    """
+    length, max_finger, thickness = np.broadcast_arrays(
+        np.asarray(length, dtype=float), 
+        np.asarray(max_finger, dtype=int), 
+        np.asarray(thickness, dtype=float))
+    n_max = 2*max_finger - 1
+    invalid = (thickness <= 0) | ~np.isfinite(length) | (length < 3*thickness) | (n_max < 3)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n = np.minimum(n_max, np.floor(length/thickness))
+        n = np.where(invalid, 3, n).astype(int)
+        # correct rounding of length/thickness, such that the result equals the loop in `max_equal_finger_configuration` 
+        n = np.where(length/n < thickness, n - 1, n)
+        n = np.where((n + 1 <= n_max) & (length/(n + 1) >= thickness), n + 1, n)
+        invalid |= n < 3
+        n = np.where(invalid, 3, n)
+        x = length/n
+
+    return np.ma.masked_array(x, mask=invalid), np.ma.masked_array((n + 1)//2, mask=invalid)
@@ -4,7 +4,7 @@ from fingerJointBoxMaker.constraints_impl import UserParamter
 from fingerJointBoxMaker.dimension import Dim
 from fingerJointBoxMaker.edge import FingerJointEdge
 from fingerJointBoxMaker.face import Face
-from fingerJointBoxMaker.geometry import Path, PathConsumerByTransfrom, Plane
+from fingerJointBoxMaker.geometry import Path, PathConsumerByTransfrom, PathConsumerReverse, Plane
 from fingerJointBoxMaker.boxes.comon import add_dimension_constraint
 
 
@@ -134,10 +134,10 @@ class SimpleBox(Box):
 
         # refelct transformation for fusion360 cooridnate system fix 
         # fingerJointBoxMaker.left_right.post_path_transforms.append(t.create_transform(t.mat_reflect_y))
-        self.left_right.post_path_consumer.append(PathConsumerByTransfrom.from_mat(t.mat_rot_90))
-        self.left_right.post_path_consumer.append(lambda x: x.reverse()) # reverse path 
+        self.left_right.post_path_consumer.append(PathConsumerByTransfrom.from_mat(t.mat_rot_90, copy=False))
+        self.left_right.post_path_consumer.append(PathConsumerReverse(copy=False)) # reverse path 
         # refelct transformation for fusion360 cooridnate system fix (offset to alline joints)
-        self.front_back.post_path_consumer.append(PathConsumerByTransfrom.from_mat(t.mat_shift(dx=self.thickness.value), t.mat_reflect_x)) # fusion360 fix
+        self.front_back.post_path_consumer.append(PathConsumerByTransfrom.from_mat(t.mat_shift(dx=self.thickness.value), t.mat_reflect_x, copy=False)) # fusion360 fix
 
     @property
     def faces(self) -> List[Face]:
@@ -0,0 +1,287 @@
+"""Declarative description of boxes as plain data.
+
+A `BoxSpec` describes edges, face layout, post transforms and constraint providers without any
+closure. It serializes to JSON, has a stable content hash and compiles into the usual `Face` and
+`EdgePathBuilder` objects (see `BoxSpec.compile`). Existing boxes can be described with `BoxSpec.from_box`.
+"""
+from __future__ import annotations
+from dataclasses import asdict, dataclass, field
+from functools import partial
+import hashlib
+import json
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from fingerJointBoxMaker.boxes.comon import Box, add_dimension_constraint, add_equal_constrains_instead_of_dimensions, \
+    add_first_line_h_or_v_constraint, add_origin_offset, add_perpendicular_constraints, add_sktech_offset, minimize_constraints
+from fingerJointBoxMaker.constraints_impl import UserParamter
+from fingerJointBoxMaker.dimension import Dim
+from fingerJointBoxMaker.edge import Edge, EdgePathBuilder, EdgeTyp, FingerJointEdge, FingerJointHolesEdge, \
+    StackableBottomTopEdge, StackableSideEdge, StraightLineEdge
+from fingerJointBoxMaker.face import Face, FacePathBuilder
+from fingerJointBoxMaker.geometry import PathConsumerByTransfrom, PathConsumerReverse, Plane
+from fingerJointBoxMaker.transform import create_transform
+
+SPEC_VERSION: int = 1
+
+_FINGER_PARAMS = (
+    ("finger", "finger"),
+    ("finger_count", "finger_count"),
+    ("notch", "notch"),
+    ("notch_count", "notch_count"),
+    ("thickness", "thickness"),
+    ("kerf", "kerf"))
+
+# edge class -> (constructor argument, attribute) of all parameters
+EDGE_TYPES: Dict[str, Tuple[type, Tuple[Tuple[str, str], ...]]] = {
+    "FingerJointEdge": (FingerJointEdge, _FINGER_PARAMS),
+    "FingerJointHolesEdge": (FingerJointHolesEdge, _FINGER_PARAMS),
+    "StackableSideEdge": (StackableSideEdge, (("stand_h", "stand_h"), *_FINGER_PARAMS)),
+    "StraightLineEdge": (StraightLineEdge, (("length", "_length"),)),
+    "StackableBottomTopEdge": (StackableBottomTopEdge, (("stand_l", "stand_l"), ("stand_h", "stand_h"), ("edge_length", "edge_length"))),
+}
+
+CONSTRAINT_PROVIDERS: Dict[str, Any] = {f.__name__: f for f in (
+    add_perpendicular_constraints,
+    add_sktech_offset,
+    add_equal_constrains_instead_of_dimensions,
+    add_dimension_constraint,
+    add_origin_offset,
+    add_first_line_h_or_v_constraint,
+    minimize_constraints)}
+
+
+def _value(value: Any) -> Any:
+    return DimSpec.of(value) if isinstance(value, Dim) else value
+
+def _from_data(value: Any) -> Any:
+    return DimSpec(**value) if isinstance(value, dict) else value
+
+def _compile_value(value: Any) -> Any:
+    return value.to_dim() if isinstance(value, DimSpec) else value
+
+
+@dataclass(frozen=True)
+class DimSpec:
+    value: float
+    name: str = ""
+    unit: str = "mm"
+
+    @classmethod
+    def of(cls, dim: Dim) -> DimSpec:
+        return cls(dim.value, dim.name, dim.unit)
+
+    def to_dim(self) -> Dim:
+        return Dim(self.value, self.name, self.unit)
+
+
+@dataclass(frozen=True)
+class StepSpec:
+    """Transform by a 3x3 `matrix` (`kind="matrix"`) or reverse of the path (`kind="reverse"`)"""
+    kind: str
+    matrix: Tuple[Tuple[float, ...], ...]|None = None
+
+    @classmethod
+    def of(cls, consumer: Any) -> StepSpec:
+        if isinstance(consumer, PathConsumerReverse):
+            return cls("reverse")
+        mat = getattr(getattr(consumer, "transfrom", None), "mat", None)
+        if isinstance(consumer, PathConsumerByTransfrom) and mat is not None:
+            return cls("matrix", tuple(tuple(row) for row in np.asarray(mat).tolist()))
+        raise ValueError(f"Path consumer {consumer!r} can not be described by a spec.")
+
+    @classmethod
+    def from_data(cls, data: dict) -> StepSpec:
+        matrix = data.get("matrix")
+        return cls(data["kind"], None if matrix is None else tuple(tuple(row) for row in matrix))
+
+    def compile(self) -> Any:
+        # steps are applied by the builder owning the path, thus in place
+        if self.kind == "reverse":
+            return PathConsumerReverse(copy=False)
+        if self.kind == "matrix":
+            return PathConsumerByTransfrom(create_transform(np.array(self.matrix)), copy=False)
+        raise ValueError(f"Unknown step kind '{self.kind}'")
+
+
+@dataclass(frozen=True)
+class EdgeSpec:
+    kind: str
+    params: Tuple[Tuple[str, Any], ...]
+    edge_type: int|None = None
+
+    @classmethod
+    def of(cls, edge: Edge) -> EdgeSpec:
+        kind = type(edge).__name__
+        if kind not in EDGE_TYPES:
+            raise ValueError(f"Edge type {kind} can not be described by a spec.")
+        params = tuple((arg, _value(getattr(edge, attr))) for arg, attr in EDGE_TYPES[kind][1])
+        edge_type = getattr(edge, "edge_type", None)
+        spec = cls(kind, params, None if edge_type is None else edge_type.value)
+        # e.g. additional path processors are not part of the spec
+        if spec.compile().cache_key() != edge.cache_key() or edge.cache_key() is None:
+            raise ValueError(f"Edge {edge!r} can not be described by a spec.")
+        return spec
+
+    @classmethod
+    def from_data(cls, data: dict) -> EdgeSpec:
+        return cls(data["kind"], tuple((k, _from_data(v)) for k, v in data["params"]), data["edge_type"])
+
+    def compile(self) -> Edge:
+        edge = EDGE_TYPES[self.kind][0](**{k: _compile_value(v) for k, v in self.params})
+        if self.edge_type is not None:
+            edge.edge_type = EdgeTyp(self.edge_type)
+        return edge
+
+
+@dataclass(frozen=True)
+class EdgeBuilderSpec:
+    edge: EdgeSpec
+    steps: Tuple[StepSpec, ...] = ()
+    concat_with_connecting_line: bool = False
+
+    @classmethod
+    def of(cls, builder: EdgePathBuilder) -> EdgeBuilderSpec:
+        steps = tuple(StepSpec.of(callback[index]) for callback, index in builder.callback_order)
+        return cls(EdgeSpec.of(builder.edge), steps, builder.concat_with_connecting_line)
+
+    @classmethod
+    def from_data(cls, data: dict) -> EdgeBuilderSpec:
+        return cls(
+            EdgeSpec.from_data(data["edge"]),
+            tuple(StepSpec.from_data(s) for s in data["steps"]),
+            data["concat_with_connecting_line"])
+
+    def compile(self) -> EdgePathBuilder:
+        builder = EdgePathBuilder(self.edge.compile())
+        for step in self.steps:
+            consumer = step.compile()
+            if isinstance(consumer, PathConsumerReverse):
+                builder.reverse_path()
+            else:
+                builder.add_transfrom(consumer.transfrom)
+        if self.concat_with_connecting_line:
+            builder.allow_concat()
+        return builder
+
+
+@dataclass(frozen=True)
+class ProviderSpec:
+    """Constraint provider given by its name in `CONSTRAINT_PROVIDERS` and keyword arguments"""
+    name: str
+    kwargs: Tuple[Tuple[str, Any], ...] = ()
+
+    @classmethod
+    def of(cls, provider: Any) -> ProviderSpec:
+        func, kwargs = provider, {}
+        if isinstance(provider, partial) and not provider.args:
+            func, kwargs = provider.func, provider.keywords
+        name = getattr(func, "__name__", None)
+        if CONSTRAINT_PROVIDERS.get(name) is not func:
+            raise ValueError(f"Constraint provider {provider!r} can not be described by a spec.")
+        return cls(name, tuple((k, _value(v)) for k, v in sorted(kwargs.items())))
+
+    @classmethod
+    def from_data(cls, data: dict) -> ProviderSpec:
+        return cls(data["name"], tuple((k, _from_data(v)) for k, v in data["kwargs"]))
+
+    def compile(self) -> Any:
+        func = CONSTRAINT_PROVIDERS[self.name]
+        if not self.kwargs:
+            return func
+        return partial(func, **{k: _compile_value(v) for k, v in self.kwargs})
+
+
+@dataclass(frozen=True)
+class FaceSpec:
+    name: str
+    plane: str
+    edges: Tuple[EdgeBuilderSpec, ...]
+    symmetric: bool = False
+    post_steps: Tuple[StepSpec, ...] = ()
+    providers: Tuple[ProviderSpec, ...] = ()
+
+    @classmethod
+    def of(cls, face: Face) -> FaceSpec:
+        return cls(
+            name=face.name,
+            plane=face.plane.name,
+            edges=tuple(EdgeBuilderSpec.of(b) for b in face.face_builder.path_builder),
+            symmetric=face.face_builder.symmetric,
+            post_steps=tuple(StepSpec.of(c) for c in face.post_path_consumer),
+            providers=tuple(ProviderSpec.of(p) for p in face.constraint_providers))
+
+    @classmethod
+    def from_data(cls, data: dict) -> FaceSpec:
+        return cls(
+            name=data["name"],
+            plane=data["plane"],
+            edges=tuple(EdgeBuilderSpec.from_data(e) for e in data["edges"]),
+            symmetric=data["symmetric"],
+            post_steps=tuple(StepSpec.from_data(s) for s in data["post_steps"]),
+            providers=tuple(ProviderSpec.from_data(p) for p in data["providers"]))
+
+    def compile(self) -> Face:
+        builder = FacePathBuilder(*(e.compile() for e in self.edges), symmetric=self.symmetric)
+        face = Face(face_builder=builder, name=self.name, plane=Plane[self.plane])
+        face.post_path_consumer.extend(s.compile() for s in self.post_steps)
+        face.constraint_providers.extend(p.compile() for p in self.providers)
+        return face
+
+
+@dataclass(frozen=True)
+class BoxSpec:
+    faces: Tuple[FaceSpec, ...]
+    parameters: Tuple[DimSpec, ...] = ()
+
+    @classmethod
+    def from_box(cls, box: Box) -> BoxSpec:
+        """Describe `box`. Raises `ValueError` if some part of it is not declarative (e.g. a lambda)."""
+        parameters = [c for c in getattr(box, "constraints", []) if isinstance(c, UserParamter)]
+        return cls(
+            faces=tuple(FaceSpec.of(f) for f in box.faces),
+            parameters=tuple(DimSpec.of(p.dim) for p in parameters))
+
+    @classmethod
+    def from_data(cls, data: dict) -> BoxSpec:
+        if data.get("version") != SPEC_VERSION:
+            raise ValueError(f"Unsupported spec version {data.get('version')}, expected {SPEC_VERSION}")
+        return cls(
+            faces=tuple(FaceSpec.from_data(f) for f in data["faces"]),
+            parameters=tuple(DimSpec(**p) for p in data["parameters"]))
+
+    @classmethod
+    def from_json(cls, text: str) -> BoxSpec:
+        return cls.from_data(json.loads(text))
+
+    def to_data(self) -> dict:
+        return {"version": SPEC_VERSION, **asdict(self)}
+
+    def to_json(self, **kwargs) -> str:
+        """JSON text of the spec. Keys are sorted, thus equal specs give equal text."""
+        kwargs.setdefault("separators", (",", ":"))
+        return json.dumps(self.to_data(), sort_keys=True, **kwargs)
+
+    def content_hash(self) -> str:
+        """SHA-256 of the canonical JSON text, stable across processes and sessions."""
+        return hashlib.sha256(self.to_json().encode("utf-8")).hexdigest()
+
+    def compile(self) -> SpecBox:
+        return SpecBox(
+            spec=self,
+            face_list=[f.compile() for f in self.faces],
+            constraints=[UserParamter(p.to_dim()) for p in self.parameters])
+
+
+@dataclass
+class SpecBox(Box):
+    """Box compiled from a `BoxSpec`"""
+
+    spec: BoxSpec
+    face_list: List[Face] = field(default_factory=list)
+    constraints: List[UserParamter] = field(default_factory=list)
+
+    @property
+    def faces(self) -> List[Face]:
+        return self.face_list
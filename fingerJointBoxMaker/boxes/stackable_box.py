@@ -29,6 +29,7 @@ class StackableBox(Box):
     side_face: Face
     bottom_face: Face
 
+    @property
     def faces(self) -> List[Face]:
         return [self.front_face, self.side_face, self.bottom_face]
 
@@ -65,7 +66,7 @@ class StackableBox(Box):
         
         # FrontFace
         height_mixin: StackableSideEdge = StackableSideEdge.from_edge(e=height.as_positive(), stand_h=bottom_top_front_edge.stand_h)
-        fb:FacePathBuilder = FacePathBuilder()      # bottom with stands for stacking
+        fb:FacePathBuilder = FacePathBuilder(symmetric=True)      # bottom with stands for stacking
         fb.add(EdgePathBuilder(bottom_top_front_edge))
         # left side with notches
         fb.add(EdgePathBuilder(height_mixin)).left_side_transform()
@@ -81,7 +82,7 @@ class StackableBox(Box):
 
         # SideFace
         height_mixin: StackableSideEdge = StackableSideEdge.from_edge(e=height.as_negative(), stand_h=bottom_top_front_edge.stand_h)
-        fb:FacePathBuilder = FacePathBuilder()      # bottom with stands for stacking
+        fb:FacePathBuilder = FacePathBuilder(symmetric=True)      # bottom with stands for stacking
         fb.add(EdgePathBuilder(bottom_top_side_edge))
         # left side with notches
         fb.add(EdgePathBuilder(height_mixin)).left_side_transform()
@@ -123,18 +124,18 @@ def get_drawing(ns: Namespace):
 
     
     t1 = create_transform(mat_shift(dx=10, dy=10))
-    p_bottom = b.build_face(b.bottom_face).transform(t1)
+    p_bottom = b.build_face(b.bottom_face, artifacts=drawing.required_artifacts).transform(t1)
     drawing.add(p_bottom, "bottom")
 
     t2 = create_transform(mat_shift(dx=10, dy=10+p_bottom.bounding_box()[1][1]))
-    p_front1 = b.build_face(b.front_face).transform(t2)
+    p_front1 = b.build_face(b.front_face, artifacts=drawing.required_artifacts).transform(t2)
     t2 = create_transform(mat_shift(dy=10+p_front1.height()))
     p_front2 = p_front1.transform(t2)
 
     drawing.add(p_front1, "front1")
     drawing.add(p_front2, "front2")
 
-    p_side1 = b.build_face(b.side_face).transform(create_transform(mat_shift(dy=10, dx=15 + p_bottom.bounding_box()[1][0])))
+    p_side1 = b.build_face(b.side_face, artifacts=drawing.required_artifacts).transform(create_transform(mat_shift(dy=10, dx=15 + p_bottom.bounding_box()[1][0])))
     p_side2 = p_side1.transform(create_transform(mat_shift(dy=10+p_side1.height())))
     drawing.add(p_side1, "side1")
     drawing.add(p_side2, "side2")
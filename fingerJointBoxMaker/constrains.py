@@ -1,7 +1,10 @@
 from __future__ import annotations
-from typing import Any, Protocol
+from typing import TYPE_CHECKING, Any, List, Protocol
 import numpy as np
 
+if TYPE_CHECKING:
+    from fingerJointBoxMaker.geometry import Line
+
 class Transform(Protocol):
 
     def __call__(self, points: np.array) -> np.array:
@@ -33,3 +36,7 @@ class Constraint(Protocol):
     def process(self, transform_F) -> Any:
         ...
 
+    def get_lines(self) -> List[Line]:
+        """Lines referenced by the constraint. Used to store the constraint by line index in a `Path`."""
+        ...
+
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from fingerJointBoxMaker.constrains import Constraint, Transform
-from fingerJointBoxMaker.geometry import Line, Path
+from fingerJointBoxMaker.geometry import ConstraintTable, Line, Path
 from fingerJointBoxMaker.dimension import Dim
 
 import numpy as np
@@ -19,10 +19,18 @@ class UserParamter:
     def process(self, transfrom_f) -> Any:
         return transfrom_f(self.dim)
 
+@ConstraintTable.register
 class OriginLockConstraint:
     def __init__(self, line:Line) -> None:
         self.line = line
 
+    @classmethod
+    def from_lines(cls, lines: List[Line], path: Path) -> Constraint:
+        return cls(lines[0])
+
+    def get_lines(self) -> List[Line]:
+        return [self.line]
+
     def get_name(self) -> str:
         return Constraint.OriginLock
 
@@ -30,22 +38,38 @@ class OriginLockConstraint:
         return transfrom_f(self.line)
 
 
+@ConstraintTable.register
 class DimenssionConstraint:
 
     def __init__(self, path: Path) -> None:
         self.path = path
 
+    @classmethod
+    def from_lines(cls, lines: List[Line], path: Path) -> Constraint:
+        return cls(path)
+
+    def get_lines(self) -> List[Line]:
+        return []
+
     def get_name(self) -> str:
         return Constraint.GeoDimension
     
     def process(self, transfrom_F) -> Any:
         return transfrom_F(self.path)
 
+@ConstraintTable.register
 class ColiniarConstraint:
 
     def __init__(self, lines: List[Line]) -> None:
         self.lines: List[Line] = lines
 
+    @classmethod
+    def from_lines(cls, lines: List[Line], path: Path) -> Constraint:
+        return cls(lines)
+
+    def get_lines(self) -> List[Line]:
+        return list(self.lines)
+
     def apply_transform(self, transform: Transform) -> Constraint:
         new_lines = [l.transform(transform) for l in self.lines]
         return ColiniarConstraint(new_lines)
@@ -57,11 +81,19 @@ class ColiniarConstraint:
         return transform_F(self.lines)
 
 
+@ConstraintTable.register
 class HorizontalConstrain:
 
     def __init__(self, *lines) -> None:
         self.lines: List[Line] = lines
 
+    @classmethod
+    def from_lines(cls, lines: List[Line], path: Path) -> Constraint:
+        return cls(*lines)
+
+    def get_lines(self) -> List[Line]:
+        return list(self.lines)
+
     def apply_transform(self, transform: Transform) -> Constraint:
         new_lines = [l.transform(transform) for l in self.lines]
         return HorizontalConstrain(*new_lines)
@@ -73,11 +105,19 @@ class HorizontalConstrain:
         return transform_F(self.lines)
 
 
+@ConstraintTable.register
 class VerticalConstrain:
 
     def __init__(self, *lines) -> None:
         self.lines: List[Line] = lines
 
+    @classmethod
+    def from_lines(cls, lines: List[Line], path: Path) -> Constraint:
+        return cls(*lines)
+
+    def get_lines(self) -> List[Line]:
+        return list(self.lines)
+
     def apply_transform(self, transform: Transform) -> Constraint:
         new_lines = [l.transform(transform) for l in self.lines]
         return VerticalConstrain(*new_lines)
@@ -89,11 +129,19 @@ class VerticalConstrain:
         return transform_F(self.lines)
 
 
+@ConstraintTable.register
 class PerpendicularConstraint:
     def __init__(self, l1: Line, l2: Line) -> None:
         self.l1: Line = l1
         self.l2: Line = l2
 
+    @classmethod
+    def from_lines(cls, lines: List[Line], path: Path) -> Constraint:
+        return cls(*lines)
+
+    def get_lines(self) -> List[Line]:
+        return [self.l1, self.l2]
+
     def apply_transform(self, transform: Transform) -> Constraint:
         return PerpendicularConstraint(
             self.l1.transform(transform),
@@ -106,8 +154,15 @@ class PerpendicularConstraint:
         return transform_f(self.l1, self.l2)
 
 
+@ConstraintTable.register
 class EqualConstraint:
 
+    @classmethod
+    def from_lines(cls, lines: List[Line], path: Path) -> Constraint:
+        if len(lines) == 0:
+            return cls()
+        return cls(lines[0], lines[1:])
+
     @classmethod
     def collect(cls, lines: List[Line]):
         e = cls()
@@ -119,6 +174,11 @@ class EqualConstraint:
         self.base_line: Line = base_line
         self.lines: List[Line] = [] if lines is None else lines
 
+    def get_lines(self) -> List[Line]:
+        if self.base_line is None:
+            return []
+        return [self.base_line, *self.lines]
+
     def apply_transform(self, transform: Transform) -> Constraint:
         return EqualConstraint(
             self.base_line.transform(transform),
@@ -141,4 +201,50 @@ class EqualConstraint:
             else:
                 raise ValueError("Lines are not equal.")
 
-        return line
\ No newline at end of file
+        return line
+
+def verify_constraints(path: Path, tol: float = 1e-6) -> NDArray:
+    """Check the geometry of `path` against its constraints in a few vectorized passes over the 
+    `ConstraintTable` and return the indices of violated constraints. 
+    
+    `tol` is an absolute tolerance in path units, for perpendicular constraints it is applied to the 
+    cosine of the angle between the lines. Constraints stored as objects (e.g. `UserParamter`) and 
+    `DimenssionConstraint` are not checked.
+    """
+    table = path.constraints
+    columns = path.lines.columns()
+    points = path.points
+    start = points[columns["start"]]
+    direction = points[columns["end"]] - start
+    length = np.hypot(direction[:, 0], direction[:, 1])
+
+    # one entry per (constraint, line). Multi line constraints are checked against their first line
+    lengths = np.diff(table.indptr)
+    row = np.repeat(np.arange(len(table)), lengths)
+    codes = table.codes[row]
+    line = table.indices
+    base = line[table.indptr[:-1][row]]
+    is_base = np.arange(len(line)) == table.indptr[:-1][row]
+    # entries of object rows do not index the line table
+    checked = codes != ConstraintTable.OBJECT
+    row, codes, line, base, is_base = row[checked], codes[checked], line[checked], base[checked], is_base[checked]
+
+    def cross(a: NDArray, b: NDArray) -> NDArray:
+        return a[:, 0]*b[:, 1] - a[:, 1]*b[:, 0]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        checks = {
+            HorizontalConstrain: np.abs(direction[line, 1]) > tol,
+            VerticalConstrain: np.abs(direction[line, 0]) > tol,
+            PerpendicularConstraint: ~is_base & (np.abs(np.einsum("ij,ij->i", direction[line], direction[base])) > tol*length[line]*length[base]),
+            EqualConstraint: ~is_base & (np.abs(length[line] - length[base]) > tol),
+            ColiniarConstraint: ~is_base & (
+                (np.abs(cross(direction[base], start[line] - start[base])) > tol*length[base]) | 
+                (np.abs(cross(direction[base], start[line] + direction[line] - start[base])) > tol*length[base])),
+            OriginLockConstraint: np.any(np.abs(start[line]) > tol, axis=1),
+        }
+
+    violated = np.zeros(len(line), dtype=bool)
+    for constraint_cls, check in checks.items():
+        violated |= (codes == ConstraintTable.code_of(constraint_cls)) & check
+    return np.unique(row[violated])
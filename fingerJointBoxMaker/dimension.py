@@ -1,18 +1,153 @@
 from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
 from dataclasses import dataclass, field
+from weakref import WeakValueDictionary
 from numpy import abs
 
+_numeric_mode: ContextVar[bool] = ContextVar("numeric_mode", default=False)
+
+def is_numeric_mode() -> bool:
+    return _numeric_mode.get()
+
+@contextmanager
+def numeric_mode(enabled: bool = True):
+    """Within this context `Dim` arithmetic only computes values and derived dimensions get an empty name.
+    Use it if names are never read, e.g. for SVG export. Values are identical to the named arithmetic.
+    The mode is a context variable, thus each thread (or asyncio task) has its own mode."""
+    token = _numeric_mode.set(enabled)
+    try:
+        yield
+    finally:
+        _numeric_mode.reset(token)
+
+# interned expression nodes. A node lives as long as some Dim (or parent node) references it.
+_nodes: WeakValueDictionary = WeakValueDictionary()
+_nodes_lock = threading.Lock()
+
+class Expr:
+    """Node of the expression DAG describing the name of a `Dim`. Nodes are interned, thus equal 
+    (sub)expressions share the same node and can be compared by identity. The name is only 
+    rendered on first use and cached afterwards."""
+
+    __slots__ = ("_text", "__weakref__")
+
+    @classmethod
+    def _intern(cls, key: tuple, *args) -> Expr:
+        node = _nodes.get(key)
+        if node is None:
+            # nodes are compared by identity, thus threads must not create the same node twice
+            with _nodes_lock:
+                node = _nodes.get(key)
+                if node is None:
+                    node = cls(*args)
+                    _nodes[key] = node
+        return node
+
+    def __init__(self) -> None:
+        self._text: str|None = None
+
+    def _render(self) -> str:
+        ...
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = self._render()
+        return self._text
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self)!r})"
+
+
+class Symbol(Expr):
+    """Named leaf of an expression"""
+
+    __slots__ = ("name",)
+
+    @classmethod
+    def of(cls, name: str) -> Symbol:
+        return cls._intern(("sym", name), name)
+
+    def __init__(self, name: str) -> None:
+        super().__init__()
+        self.name: str = name
+
+    def __reduce__(self):
+        return (Symbol.of, (self.name,))
+
+    def _render(self) -> str:
+        return self.name
+
+
+class BinaryExpr(Expr):
+    """Binary operation `left opt right`. Operands containing a space are put in parentheses."""
+
+    __slots__ = ("opt", "left", "right")
+
+    @classmethod
+    def of(cls, opt: str, left: Expr, right: Expr) -> BinaryExpr:
+        return cls._intern(("bin", opt, left, right), opt, left, right)
+
+    def __init__(self, opt: str, left: Expr, right: Expr) -> None:
+        super().__init__()
+        self.opt: str = opt
+        self.left: Expr = left
+        self.right: Expr = right
+
+    def __reduce__(self):
+        return (BinaryExpr.of, (self.opt, self.left, self.right))
+
+    def _render(self) -> str:
+        out = []
+        for node in (self.left, self.right):
+            text = str(node)
+            if " " in text.strip():
+                out.append(f"({text})")
+            else:
+                out.append(text)
+        return f" {self.opt} ".join(out)
+
+
+class DivByExpr(Expr):
+    """Division by a number, rendered without spaces (see `Dim.div_by`)"""
+
+    __slots__ = ("expr", "divisor")
+
+    @classmethod
+    def of(cls, expr: Expr, divisor: int|float) -> DivByExpr:
+        return cls._intern(("div", expr, type(divisor), divisor), expr, divisor)
+
+    def __init__(self, expr: Expr, divisor: int|float) -> None:
+        super().__init__()
+        self.expr: Expr = expr
+        self.divisor: int|float = divisor
+
+    def __reduce__(self):
+        return (DivByExpr.of, (self.expr, self.divisor))
+
+    def _render(self) -> str:
+        return f"{self.expr}/{self.divisor}"
+
+
+_EMPTY: Expr = Symbol.of("")
+
+
 class AbsDimHashKey:
+    """Key of a dimension by absolute value, name and unit. Names are compared by node identity first, 
+    a named `Dim(v, "a + b")` still equals the same expression built by arithmetic. The rendered name 
+    used by the hash is cached on the node."""
 
     def __init__(self, dim: Dim) -> None:
         self.dim = dim
 
     def __hash__(self) -> int:
-        return hash((self.dim.abs_value, self.dim.name, self.dim.unit))
+        return hash((self.dim.abs_value, str(self.dim.node), self.dim.unit))
 
     def __eq__(self, __value: object) -> bool:
         if isinstance(__value, AbsDimHashKey):
-            return self.dim.abs_equal(__value.dim)
+            other = __value.dim
+            return self.dim.abs_value == other.abs_value and self.dim.same_name(other) and self.dim.unit == other.unit
         return False
     
     def __str__(self) -> str:
@@ -22,11 +157,28 @@ class AbsDimHashKey:
         return self.__str__()
 
 
-@dataclass
+@dataclass(slots=True, init=False, repr=False)
 class Dim:
     value: float
-    name: str  = ""
-    unit: str = "mm"
+    node: Expr
+    unit: str
+
+    def __init__(self, value: float, name: str|Expr = "", unit: str = "mm") -> None:
+        self.value: float = value
+        self.node: Expr = name if isinstance(name, Expr) else Symbol.of(name)
+        self.unit: str = unit
+
+    @property
+    def name(self) -> str:
+        """Name of the dimension rendered from its expression node"""
+        return str(self.node)
+
+    @name.setter
+    def name(self, name: str):
+        self.node = Symbol.of(name)
+
+    def __repr__(self) -> str:
+        return f"Dim(value={self.value!r}, name={self.name!r}, unit={self.unit!r})"
 
     @property
     def is_paramter(self):
@@ -51,7 +203,10 @@ class Dim:
         return self.unit == other.unit
     
     def abs_equal(self, other: Dim) -> bool:
-        return self.abs_value == other.abs_value and self.name == other.name and self.unit == other.unit
+        return self.abs_value == other.abs_value and self.same_name(other) and self.unit == other.unit
+
+    def same_name(self, other: Dim) -> bool:
+        return self.node is other.node or self.name == other.name
 
     def expresion(self):
         if self.is_paramter:
@@ -85,21 +240,20 @@ class Dim:
             return True
         raise TypeError(f"'{opt}' not supported between '{type(self)}' instance with missmatching units. {self.unit} != {other.unit} ")
     
-    def _combine_names(self, other: Dim, opt):
-        out = []
-        if " " in self.name.strip():
-            out.append(f"({self.name})")
-        else:
-            out.append(self.name)
-        if " " in other.name.strip():
-            out.append(f"({other.name})")
-        else:
-            out.append(other.name)
-        return f" {opt} ".join(out)
+    def _scalar_node(self) -> Expr:
+        """Node of the result of arithmetic with a number, the name does not change"""
+        if _numeric_mode.get():
+            return _EMPTY
+        return self.node
+
+    def _combine_names(self, other: Dim, opt) -> Expr:
+        if _numeric_mode.get():
+            return _EMPTY
+        return BinaryExpr.of(opt, self.node, other.node)
     
     def __mul__(self, other) -> Dim:
         if isinstance(other, (int, float)):
-            return Dim(self.value * other, self.name, self.unit) 
+            return Dim(self.value * other, self._scalar_node(), self.unit) 
         elif self.__assert_compatable(other, "*"):
             return Dim(self.value * other.value, self._combine_names(other, "*"), self.unit)
         else:
@@ -107,7 +261,7 @@ class Dim:
     
     def __rmul__(self, other) -> Dim:
         if isinstance(other, (int, float)):
-            return Dim(other * self.value, self.name, self.unit) 
+            return Dim(other * self.value, self._scalar_node(), self.unit) 
         elif self.__assert_compatable(other, "*"):
             return Dim(other.value * self.value, other._combine_names(self, "*"), self.unit)
         else:
@@ -115,7 +269,7 @@ class Dim:
     
     def __truediv__(self, other) -> Dim:
         if isinstance(other, (int, float)):
-            return Dim(self.value/other, self.name, self.unit)
+            return Dim(self.value/other, self._scalar_node(), self.unit)
         elif self.__assert_compatable(other, "/"):
             return Dim(self.value/other.value, self._combine_names(other, "/"), self.unit)
         else:
@@ -123,7 +277,7 @@ class Dim:
 
     def __rtruediv__(self, other) -> Dim:
         if isinstance(other, (int, float)):
-            return Dim(other/self.value, self.name, self.unit)
+            return Dim(other/self.value, self._scalar_node(), self.unit)
         elif  self.__assert_compatable(other, "/"):
             return Dim(other.value/self.value, other._combine_names(self, "/"), self.unit)
         else:
@@ -131,12 +285,13 @@ class Dim:
 
     def div_by(self, val:int) -> Dim:
         d: Dim = self/val
-        d.name = f"{d.name}/{val}"
+        if not _numeric_mode.get():
+            d.node = DivByExpr.of(d.node, val)
         return d
     
     def __add__(self, other) -> Dim:
         if isinstance(other, (float, int)):
-            return Dim(self.value + other, self.name, self.unit)
+            return Dim(self.value + other, self._scalar_node(), self.unit)
         elif self.__assert_compatable(other, "+"):
             return Dim(self.value + other.value, self._combine_names(other, "+"), "mm")
         else:
@@ -144,7 +299,7 @@ class Dim:
     
     def __radd__(self, other) -> Dim:
         if isinstance(other, (float, int)):
-            return Dim(other + self.value, self.name, self.unit)
+            return Dim(other + self.value, self._scalar_node(), self.unit)
         elif self.__assert_compatable(other, "+"):
             return Dim(other.value + self.value, other._combine_names(self, "+"), "mm")
         else:
@@ -152,7 +307,7 @@ class Dim:
 
     def __sub__(self, other) -> Dim:
         if isinstance(other, (float, int)):
-            return Dim(self.value - other, self.name, self.unit)
+            return Dim(self.value - other, self._scalar_node(), self.unit)
         elif self.__assert_compatable(other, "-"):
             return Dim(self.value - other.value, self._combine_names(other, "-"), self.unit)
         else:
@@ -160,7 +315,7 @@ class Dim:
 
     def __rsub__(self, other) -> Dim:
         if isinstance(other, (float, int)):
-            return Dim(other - self.value, self.name, self.unit)
+            return Dim(other - self.value, self._scalar_node(), self.unit)
         elif self.__assert_compatable(other, "-"):
             return Dim(other.value - self.value, other._combine_names(self, "-"), self.unit)
         else:
@@ -179,7 +334,7 @@ class Dim:
         if isinstance(other, (int, float)):
             return self.value == other
         elif isinstance(other, Dim):
-            return self.value == other.value and self.name == other.name and self.unit == other.unit
+            return self.value == other.value and self.same_name(other) and self.unit == other.unit
         else:
             raise TypeError (f"'==' not supported between instances of '{type(self)}' and '{type(other)}'")
     
@@ -199,6 +354,8 @@ class Dim:
         else:
             raise TypeError (f"'<' not supported between instances of '{type(self)}' and '{type(other)}'")
 
+    def as_tuple(self) -> tuple:
+        return (self.value, self.name, self.unit)
+
     def as_abs_tuple(self) -> tuple:
         return (self.abs_value, self.name, self.unit)
-    
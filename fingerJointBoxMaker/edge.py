@@ -1,11 +1,17 @@
 from __future__ import annotations
 import enum
-from typing import Any, Protocol, List, Tuple
+from typing import Any, Protocol, List, Tuple, NamedTuple
 from abc import ABC
+from collections import OrderedDict
+from functools import partial
+import threading
+import types
 
-from fingerJointBoxMaker.dimension import Dim
-from fingerJointBoxMaker.geometry import Path, PathConsumer, PathBuilder, PathConsumerByTransfrom
+from fingerJointBoxMaker.dimension import Dim, is_numeric_mode
+from fingerJointBoxMaker.geometry import Path, PathConsumer, PathBuilder, PathConsumerByTransfrom, PathConsumerReverse
 from fingerJointBoxMaker.transform import Transform, create_transform
+import numpy as np
+from numpy.typing import NDArray
 import logging
 
 class EdgePathBuilder:
@@ -28,7 +34,7 @@ class EdgePathBuilder:
         return self
     
     def reverse_path(self) -> EdgePathBuilder:
-        return self.add_path_consumer(lambda x: x.reverse(copy=False))
+        return self.add_path_consumer(PathConsumerReverse(copy=False))
     
     def allow_concat(self) -> EdgePathBuilder:
         self.concat_with_connecting_line = True 
@@ -40,10 +46,37 @@ class EdgePathBuilder:
 
     def add_transfrom(self, transfrom: Transform) -> EdgePathBuilder:
         """append transforms."""
-        self.path_transforms.append(PathConsumerByTransfrom(transfrom))
+        self.path_transforms.append(PathConsumerByTransfrom(transfrom, copy=False))
         self.callback_order.append((self.path_transforms, len(self.path_transforms)-1))
         return self
 
+    def composed(self) -> Tuple[NDArray|None, bool]|None:
+        """Fold all callbacks into a single matrix (None if there is no transform) and a flag whether 
+        the path is reversed. Returns None if a callback is neither a matrix transform nor a reverse."""
+        mat, reverse = None, False
+        for calback, index in self.callback_order:
+            consumer = calback[index]
+            if isinstance(consumer, PathConsumerReverse):
+                reverse = not reverse
+            elif isinstance(consumer, PathConsumerByTransfrom) and getattr(consumer.transfrom, "mat", None) is not None:
+                mat = consumer.transfrom.mat if mat is None else np.matmul(consumer.transfrom.mat, mat)
+            else:
+                return None
+        return mat, reverse
+
+    def cache_key(self) -> tuple|None:
+        """Hashable key describing the path built by this builder, None if it has none (see `consumer_key`)."""
+        edge_key = self.edge.cache_key()
+        if edge_key is None:
+            return None
+        key = [edge_key, self.concat_with_connecting_line]
+        for calback, index in self.callback_order:
+            consumer = consumer_key(calback[index])
+            if consumer is None:
+                return None
+            key.append(consumer)
+        return tuple(key)
+
     # path builder
     def __call__(self) -> Path:
         """create path"""
@@ -174,14 +207,139 @@ def count_N_a(x: float, r: float, k:int, t: float) -> float:
     return x/(k*t*(1+r)) - r/(1+r)
 
 
+def dim_key(dim: Dim|None) -> tuple|None:
+    """Hashable key of `dim`. The type of the value is part of the key as it changes the expression of unnamed dimensions."""
+    if dim is None:
+        return None
+    return (type(dim.value), dim.value, dim.node, dim.unit)
+
+
+def _argument_key(value: Any) -> Any|None:
+    """Key of a `partial` argument. Only values without mutable state have a key."""
+    if isinstance(value, Dim):
+        return dim_key(value)
+    if value is None or isinstance(value, (bool, int, float, str, enum.Enum)):
+        return (type(value), value)
+    if isinstance(value, tuple):
+        keys = tuple(_argument_key(v) for v in value)
+        return None if any(k is None for k in keys) else keys
+    return None
+
+
+def consumer_key(consumer: Any) -> Any|None:
+    """Structural key of a path consumer or constraint provider, None if it has none. Matrix transforms 
+    are keyed by their matrix and `partial` objects by function and arguments, where `Dim` arguments are 
+    keyed by value. Functions are keyed by identity, which is only safe without captured state. Thus 
+    closures, other callable objects (e.g. bound methods) and `partial` arguments which are not plain 
+    values (see `_argument_key`) have no key and disable caching."""
+    if isinstance(consumer, PathConsumerByTransfrom) and getattr(consumer.transfrom, "mat", None) is not None:
+        mat = np.asarray(consumer.transfrom.mat)
+        return (PathConsumerByTransfrom, mat.dtype.str, mat.shape, mat.tobytes())
+    if isinstance(consumer, PathConsumerReverse):
+        return PathConsumerReverse
+    if isinstance(consumer, partial):
+        func = consumer_key(consumer.func)
+        args = tuple(_argument_key(a) for a in consumer.args)
+        keywords = tuple((k, _argument_key(v)) for k, v in sorted(consumer.keywords.items()))
+        if func is None or any(a is None for a in args) or any(v is None for _, v in keywords):
+            return None
+        return (partial, func, args, keywords)
+    if isinstance(consumer, types.FunctionType) and consumer.__closure__ is None:
+        return consumer
+    return None
+
+
+class EdgePathCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class EdgePathCache:
+    """LRU-bounded cache of frozen edge paths keyed by `Edge.cache_key`."""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize: int = maxsize
+        self._templates: OrderedDict[tuple, Path] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def get(self, edge: Edge) -> Path:
+        """Frozen template path of `edge`. The path is built on a cache miss."""
+        key = edge.cache_key()
+        if key is None or self.maxsize <= 0:
+            return edge.make_path(use_cache=False).freeze()
+        # dims of paths built in numeric mode have no names
+        key = (is_numeric_mode(), key)
+
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self.hits += 1
+                self._templates.move_to_end(key)
+                return template
+            self.misses += 1
+
+        # build outside of the lock, concurrent misses of the same key build equal paths
+        template = edge.make_path(use_cache=False).freeze()
+        with self._lock:
+            self._templates[key] = template
+            while len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+                self.evictions += 1
+        return template
+
+    def info(self) -> EdgePathCacheInfo:
+        return EdgePathCacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._templates))
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+edge_path_cache = EdgePathCache()
+
+
 class Edge(ABC):
 
     def __init__(self) -> None:
         super().__init__()
         self.path_pre_processors : List[PathConsumer] = []
         self.path_post_processors : List[PathConsumer] = []
-     
-    def make_path(self) -> Path:
+
+    def cache_key(self) -> tuple|None:
+        """Hashable key that fully describes the path of the edge. Edges without key (None) are not cached."""
+        return None
+
+    def _processors_key(self) -> tuple|None:
+        """Key of pre and post processors. Bound methods of the edge itself are keyed by their function 
+        as the state of the edge is part of `cache_key`. Processors without key (see `consumer_key`) 
+        prevent caching."""
+        key = []
+        for processors in (self.path_pre_processors, self.path_post_processors):
+            for processor in processors:
+                if getattr(processor, "__self__", None) is self:
+                    processor = processor.__func__
+                processor = consumer_key(processor)
+                if processor is None:
+                    return None
+                key.append(processor)
+            key.append(None) # separate pre and post processors
+        return tuple(key)
+
+    def make_path(self, use_cache: bool = True) -> Path:
+        """Create a new path for this edge. If `use_cache` is set the path is copied from a template 
+        in `edge_path_cache` which is only built once for equal edges."""
+        if use_cache:
+            return edge_path_cache.get(self).copy(deep=False)
+
         p = Path.zero()
         for processor in self.path_pre_processors:
             p = processor(p)
@@ -211,6 +369,13 @@ class StraightLineEdge(Edge):
     def __init__(self, length: Dim|float) -> None:
         super().__init__()
         self._length: Dim|float = length
+
+    def cache_key(self) -> tuple|None:
+        processors = self._processors_key()
+        if processors is None:
+            return None
+        length = dim_key(self._length) if isinstance(self._length, Dim) else (type(self._length), self._length)
+        return (type(self), length, processors)
     
     @property
     def length(self) -> float:
@@ -231,6 +396,13 @@ class StackableBottomTopEdge(Edge):
         self.stand_l: Dim = stand_l
         self.stand_h: Dim = stand_h
         self.edge_length: Dim = edge_length
+
+    def cache_key(self) -> tuple|None:
+        processors = self._processors_key()
+        if processors is None:
+            return None
+        return (type(self), dim_key(self.stand_l), dim_key(self.stand_h), dim_key(self.edge_length), processors)
+
     @property
     def length(self) -> float:
         return self.edge_length.value
@@ -406,6 +578,21 @@ class FingerJointEdge(Edge):
         e.edge_type = EdgeTyp(-1*(self.edge_type.value))
         return e
 
+    def cache_key(self) -> tuple|None:
+        processors = self._processors_key()
+        if processors is None:
+            return None
+        return (
+            type(self),
+            self.edge_type,
+            dim_key(self.finger),
+            dim_key(self.finger_count),
+            dim_key(self.notch),
+            dim_key(self.notch_count),
+            dim_key(self.thickness),
+            dim_key(self.kerf),
+            processors)
+
     def __eq__(self, other: object) -> bool:
         if isinstance(other, FingerJointEdge):
             return self.edge_type == other.edge_type and \
@@ -472,6 +659,28 @@ class FingerJointEdge(Edge):
         return ret
 
     def build_path(self, path: Path) -> Path:
+        """Append the periodic finger/notch pattern to `path` in a single pass. Result is 
+        identical to `build_path_sequential`."""
+        t = self.thickness
+        if self.is_positive_edge(): # postive edge: finger->notch->finger
+            first, inner, last = self.get_finger(True), self.get_finger(False), self.get_finger(first_last=True)
+            block = [inner, t, self.get_notch(first_last=False), -t]
+        else: # negative edge: notch->finger->notch
+            first, inner, last = self.get_notch(True), self.get_notch(False), self.get_notch(first_last=True)
+            block = [inner, -t, self.get_finger(first_last=False), t]
+
+        reps = self.rep_count()
+        # segments alternate horizontal, vertical, horizontal, vertical
+        deltas = np.tile(np.array([[block[0].value, 0.], [0., block[1].value], [block[2].value, 0.], [0., block[3].value]]), (reps, 1))
+        deltas = np.append(deltas, [[last.value, 0.]], axis=0)
+        dims = [*block]*reps + [last]
+        if reps > 0:
+            deltas[0, 0] = first.value
+            dims[0] = first
+        return path.add_segments(deltas, dims)
+
+    def build_path_sequential(self, path: Path) -> Path:
+        """Reference implementation of `build_path` adding one segment at a time"""
         for i in range(self.rep_count()):
             if self.is_positive_edge(): # postive edge: finger->notch->finger
                 path.h_dim(self.get_finger(i==0))
@@ -523,8 +732,34 @@ class FingerJointHolesEdge(FingerJointEdge):
         return path
     
     def build_path(self, path: Path) -> Path:
-        path: Path = Path.zero()
-
+        """Append all holes and the construction lines between them to `path` in a single pass. 
+        Result is identical to `build_path_sequential`."""
+        notch, t = self.get_notch(False), self.thickness
+        # hole: h, v, h, v and a construction line to the end of the hole
+        hole = [[notch.value, 0.], [0., t.value], [-notch.value, 0.], [0., -t.value], [notch.value, 0.]]
+        hole_dims = [notch, t, -notch, -t, notch]
+        hole_construction = [False, False, False, False, True]
+
+        reps = self.rep_count()
+        if self.is_positive_edge(): # positive edge: finger->notch->finger
+            first, inner, last = self.get_finger(True), self.get_finger(False), self.get_finger(first_last=True)
+            block, block_dims, block_construction = [[inner.value, 0.], *hole], [inner, *hole_dims], [True, *hole_construction]
+            end, end_dims, end_construction = [[last.value, 0.]], [last], [True]
+        else: # negative edge: notch->finger->notch
+            finger = self.get_finger(first_last=False)
+            block, block_dims, block_construction = [*hole, [finger.value, 0.]], [*hole_dims, finger], [*hole_construction, True]
+            end, end_dims, end_construction = hole, hole_dims, hole_construction
+
+        deltas = np.append(np.tile(np.array(block), (reps, 1)), end, axis=0)
+        dims = block_dims*reps + end_dims
+        construction = np.append(np.tile(block_construction, reps), end_construction)
+        if reps > 0 and self.is_positive_edge():
+            deltas[0, 0] = first.value
+            dims[0] = first
+        return path.add_segments(deltas, dims, construction)
+
+    def build_path_sequential(self, path: Path) -> Path:
+        """Reference implementation of `build_path` adding one hole at a time"""
         for i in range(self.rep_count()):
             if self.is_positive_edge(): # positive edge: finger->notch->finger
                 path.h_dim(self.get_finger(i==0)).as_construciont_line()
@@ -556,6 +791,12 @@ class StackableSideEdge(FingerJointEdge):
         super().__init__(finger, finger_count, notch, notch_count, thickness, kerf)
         self.stand_h: Dim = stand_h
         self.path_pre_processors.insert(0, self.append_start) 
+
+    def cache_key(self) -> tuple|None:
+        key = super().cache_key()
+        if key is None:
+            return None
+        return (*key, dim_key(self.stand_h))
     
     def append_start(self, path: Path) -> Path:
         path.h_dim(self.stand_h + self.thickness)
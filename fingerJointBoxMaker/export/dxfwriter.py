@@ -0,0 +1,104 @@
+"""DXF export of box parts without third party dependencies.
+
+The file is written in the DXF R12 (AC1009) format, each connected run of cut lines becomes one
+polyline. Closed runs are marked as closed polylines, thus the start point is not repeated.
+"""
+from __future__ import annotations
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from fingerJointBoxMaker.geometry import Path
+from fingerJointBoxMaker.export.svgwriter import BoxDrawing, open_output
+
+
+def polyline_runs(path: Path) -> Iterator[Tuple[np.ndarray, bool, bool]]:
+    """Split `path` into runs of consecutive lines with the same construction flag. Yields the
+    points of the run, the construction flag and if the run is closed."""
+    columns = path.lines.columns()
+    points = path.points
+    construction = columns["construction"]
+    if len(construction) == 0:
+        return
+    bounds = np.concatenate([[0], np.flatnonzero(np.diff(construction)) + 1, [len(construction)]])
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        run = points[np.concatenate([columns["start"][first:first + 1], columns["end"][first:last]])]
+        closed = len(run) > 2 and np.allclose(run[0], run[-1])
+        yield (run[:-1] if closed else run), bool(construction[first]), closed
+
+
+class DxfDrawing(BoxDrawing):
+    """DXF export with the same interface as `BoxDrawing`. Parts are streamed run by run to the file.
+
+    Construction lines (see `Line.is_construction`) are written to the layer `CONSTRUCTION`
+    (`construction="layer"`) or left out, such that they are only pen-up moves between the cut
+    polylines (`construction="pen-up"`). Polylines are R12 `POLYLINE`/`VERTEX` entities.
+    The y axis of DXF points up, thus parts are mirrored at the same bound used by the SVG export
+    and appear the same way up in both.
+    """
+
+    CUT_LAYER = "CUT"
+    CONSTRUCTION_LAYER = "CONSTRUCTION"
+    CONSTRUCTION_MODES = ("layer", "pen-up")
+    # layer -> ACI color
+    LAYERS = {CUT_LAYER: 5, CONSTRUCTION_LAYER: 8}
+
+    def __init__(self, construction: str = "layer") -> None:
+        if construction not in self.CONSTRUCTION_MODES:
+            raise ValueError(f"Unknown construction mode '{construction}', expected one of {list(self.CONSTRUCTION_MODES)}")
+        super().__init__()
+        self.construction: str = construction
+
+    @classmethod
+    def from_drawing(cls, drawing: BoxDrawing, **kwargs) -> DxfDrawing:
+        """DXF export of the parts added to `drawing`"""
+        ret = cls(**kwargs)
+        for p, name in zip(drawing.paths, drawing.names):
+            ret.add(p, name)
+        return ret
+
+    @staticmethod
+    def _group(code: int, value) -> str:
+        return f"{code:>3}\n{value}\n"
+
+    def _header(self) -> str:
+        g = self._group
+        layers = "".join(
+            g(0, "LAYER") + g(2, name) + g(70, 0) + g(62, color) + g(6, "CONTINUOUS")
+            for name, color in self.LAYERS.items())
+        return (
+            g(0, "SECTION") + g(2, "HEADER") + g(9, "$ACADVER") + g(1, "AC1009") + g(0, "ENDSEC") +
+            g(0, "SECTION") + g(2, "TABLES") +
+            g(0, "TABLE") + g(2, "LTYPE") + g(70, 1) +
+            g(0, "LTYPE") + g(2, "CONTINUOUS") + g(70, 0) + g(3, "Solid line") + g(72, 65) + g(73, 0) + g(40, 0.0) +
+            g(0, "ENDTAB") +
+            g(0, "TABLE") + g(2, "LAYER") + g(70, len(self.LAYERS)) + layers + g(0, "ENDTAB") +
+            g(0, "ENDSEC") +
+            g(0, "SECTION") + g(2, "ENTITIES"))
+
+    def polyline(self, points: np.ndarray, closed: bool, layer: str) -> str:
+        """Polyline entity with the given `points` (already in DXF coordinates)"""
+        g = self._group
+        x, y = points.T.tolist()
+        vertex = g(0, "VERTEX") + g(8, layer) + f"{10:>3}\n{{}}\n{20:>3}\n{{}}\n" + g(30, 0.0)
+        vertices = "".join(map(vertex.format, x, y))
+        return (
+            g(0, "POLYLINE") + g(8, layer) + g(66, 1) + g(70, int(closed)) + g(10, 0.0) + g(20, 0.0) + g(30, 0.0) +
+            vertices + g(0, "SEQEND") + g(8, layer))
+
+    def write(self, fd):
+        height = self.bbox()[1][1] + 30
+        fd.write(self._header())
+        for p in self.paths:
+            for points, construction, closed in polyline_runs(p):
+                if construction and self.construction == "pen-up":
+                    continue
+                layer = self.CONSTRUCTION_LAYER if construction else self.CUT_LAYER
+                # + 0.0 turns -0.0 into 0.0
+                points = np.column_stack([points[:, 0], height - points[:, 1]]) + 0.0
+                fd.write(self.polyline(points, closed, layer))
+        fd.write(self._group(0, "ENDSEC") + self._group(0, "EOF"))
+
+    def save(self, path):
+        with open_output(path, compress=False) as fd:
+            self.write(fd)
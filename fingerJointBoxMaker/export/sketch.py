@@ -0,0 +1,96 @@
+from __future__ import annotations
+import os
+import zipfile
+from typing import IO, Iterable, NamedTuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from fingerJointBoxMaker.constraints_impl import UserParamter
+from fingerJointBoxMaker.geometry import ConstraintTable, Path
+
+
+class SketchArrays(NamedTuple):
+    """Path, constraints and user parameters as flat arrays for sketch solvers.
+
+    Line `i` goes from `points[lines[i, 0]]` to `points[lines[i, 1]]`, lines without a dimension 
+    have `dim_values[i] = nan`. Constraint `k` is of type `constraint_names[constraint_types[k]]` 
+    and refers to the lines `constraint_indices[constraint_indptr[k]:constraint_indptr[k+1]]`. 
+    User parameters are stored as symbol table (`parameter_names`, `parameter_values`, `parameter_units`).
+    """
+    points: NDArray
+    lines: NDArray
+    construction: NDArray
+    dim_values: NDArray
+    dim_names: NDArray
+    constraint_types: NDArray
+    constraint_indptr: NDArray
+    constraint_indices: NDArray
+    constraint_names: NDArray
+    parameter_names: NDArray
+    parameter_values: NDArray
+    parameter_units: NDArray
+
+    @classmethod
+    def from_path(cls, path: Path, parameters: Iterable[UserParamter] = ()) -> SketchArrays:
+        """Export `path`. Constraints stored as objects are skipped, except `UserParamter`, which 
+        are added to the symbol table together with `parameters`."""
+        columns = path.lines.columns()
+        dims = path.lines.dims
+        table = path.constraints
+
+        lengths = np.diff(table.indptr)
+        indexed = table.codes != ConstraintTable.OBJECT
+        parameters = [*parameters, *(c for c in table.objects if isinstance(c, UserParamter))]
+
+        return cls(
+            points=np.array(path.points, dtype=np.float64),
+            lines=np.stack([columns["start"], columns["end"]], axis=1).astype(np.intp),
+            construction=columns["construction"].astype(bool),
+            dim_values=np.array([np.nan if d is None else d.value for d in dims], dtype=np.float64),
+            dim_names=np.array(["" if d is None else d.name for d in dims], dtype=str),
+            constraint_types=table.codes[indexed].astype(np.int8),
+            constraint_indptr=np.append(0, np.cumsum(lengths[indexed])).astype(np.intp),
+            constraint_indices=table.indices[np.repeat(indexed, lengths)].astype(np.intp),
+            constraint_names=np.array([t.__name__ for t in ConstraintTable.registered_types()], dtype=str),
+            parameter_names=np.array([p.dim.name for p in parameters], dtype=str),
+            parameter_values=np.array([p.dim.value for p in parameters], dtype=np.float64),
+            parameter_units=np.array([p.dim.unit for p in parameters], dtype=str),
+        )
+
+    @property
+    def constraint_arity(self) -> NDArray:
+        return np.diff(self.constraint_indptr)
+
+    def save(self, file: str|os.PathLike|IO):
+        """Write all arrays to a single uncompressed `.npz` file, which allows to memory map them."""
+        np.savez(file, **self._asdict())
+
+    @classmethod
+    def load(cls, file: str|os.PathLike, mmap: bool = True) -> SketchArrays:
+        """Read arrays written by `save`. With `mmap` the arrays are read only memory maps of the file."""
+        if not mmap:
+            with np.load(file) as data:
+                return cls(**{name: data[name] for name in cls._fields})
+
+        arrays = {}
+        with open(file, "rb") as f, zipfile.ZipFile(f) as archive:
+            for info in archive.infolist():
+                if info.compress_type != zipfile.ZIP_STORED:
+                    raise ValueError(f"Can not memory map compressed member '{info.filename}'")
+                # skip the local file header, its name and extra field have variable length
+                f.seek(info.header_offset + 26)
+                name_length, extra_length = np.frombuffer(f.read(4), dtype="<u2")
+                f.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+                name = info.filename.removesuffix(".npy")
+                if np.prod(shape) == 0:
+                    arrays[name] = np.empty(shape, dtype=dtype)
+                else:
+                    arrays[name] = np.memmap(f, dtype=dtype, mode="r", offset=f.tell(), shape=shape, 
+                                             order="F" if fortran_order else "C")
+        return cls(**{name: arrays[name] for name in cls._fields})
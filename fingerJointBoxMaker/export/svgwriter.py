@@ -1,16 +1,101 @@
 from __future__ import annotations
-from typing import List
+from contextlib import contextmanager
+import gzip
+import hashlib
+import io
+from typing import Dict, List, Tuple
 # from fingerJointBoxMaker.boxes.stackable_box import StackableBox
 # from fingerJointBoxMaker.dimension import Dim
 # from fingerJointBoxMaker.edge import FingerJointEdge
-from fingerJointBoxMaker.geometry import Path, Line
+from fingerJointBoxMaker.geometry import Orientation, Path, Line
+from fingerJointBoxMaker.face import Artifact
 
 import svgwrite as svg
 import svgwrite.path as spath
 import numpy as np
+from xml.sax.saxutils import escape
 
 # from fingerJointBoxMaker.transform import create_transform, mat_shift
 
+
+@contextmanager
+def open_output(path, compress: bool|None = None):
+    """Text stream for writing to `path` (file name or open stream). If `compress` is set, or is None 
+    and the file name ends with `.svgz`, the text is gzip compressed while it is written. Open streams 
+    are not closed; a compressed stream needs a binary stream (e.g. `sys.stdout.buffer`)."""
+    if compress is None:
+        compress = isinstance(path, str) and path.endswith(".svgz")
+    if isinstance(path, str):
+        opener = gzip.open(path, "wt", encoding="utf-8") if compress else open(path, "w+", encoding="utf-8")
+        with opener as fd:
+            yield fd
+    elif not compress:
+        yield path
+    else:
+        binary = getattr(path, "buffer", path)
+        if isinstance(binary, io.TextIOBase):
+            raise ValueError("Compressed output needs a binary stream")
+        # closing the GzipFile does not close `binary`
+        with io.TextIOWrapper(gzip.GzipFile(fileobj=binary, mode="wb"), encoding="utf-8") as fd:
+            yield fd
+
+
+def _format_numbers(values: np.ndarray, precision: int) -> np.ndarray:
+    """Format `values` with at most `precision` decimals and without trailing zeros"""
+    text = np.char.mod(f"%.{precision}f", values)
+    if precision > 0:
+        text = np.char.rstrip(np.char.rstrip(text, "0"), ".")
+    return text
+
+
+def _join_pair(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Join two number columns. Always with a space, svgwrite does not accept a sign as separator."""
+    return np.char.add(np.char.add(a, " "), b)
+
+
+def compact_path_data(path: Path, precision: int = 3) -> str:
+    """SVG path data of `path` (without closing `z`) using the shortest of the absolute and relative 
+    command for each line. Horizontal and vertical lines, known from the line orientation, are written 
+    as H/h and V/v commands, construction lines as M/m. Coordinates are rounded to `precision` decimals
+    first, thus relative commands do not accumulate rounding errors.
+    """
+    columns = path.lines.columns()
+    orientation = path.lines.orientation
+    # + 0.0 turns -0.0 into 0.0
+    points = np.round(path.points, precision) + 0.0
+    end = points[columns["end"]]
+    prev = np.concatenate([points[:1], end[:-1]])
+    delta = np.round(end - prev, precision) + 0.0
+
+    x, y = _format_numbers(end[:, 0], precision), _format_numbers(end[:, 1], precision)
+    dx, dy = _format_numbers(delta[:, 0], precision), _format_numbers(delta[:, 1], precision)
+    horizontal = orientation == Orientation.Horizontal.value
+    vertical = orientation == Orientation.Vertical.value
+    construction = columns["construction"]
+
+    absolute = np.where(horizontal, np.char.add("H", x), np.where(vertical, np.char.add("V", y), np.char.add("L", _join_pair(x, y))))
+    relative = np.where(horizontal, np.char.add("h", dx), np.where(vertical, np.char.add("v", dy), np.char.add("l", _join_pair(dx, dy))))
+    absolute = np.where(construction, np.char.add("M", _join_pair(x, y)), absolute)
+    relative = np.where(construction, np.char.add("m", _join_pair(dx, dy)), relative)
+    commands = np.where(np.char.str_len(relative) < np.char.str_len(absolute), relative, absolute)
+
+    start = _join_pair(*_format_numbers(points[0], precision).reshape(2, 1))[0]
+    return f"M{start}" + "".join(commands.tolist())
+
+
+def part_key(path: Path, decimals: int = 6) -> Tuple[bytes, np.ndarray]:
+    """Hash of the geometry of `path` that does not depend on its position, and the position (first point).
+    Paths with the same key are translated copies of each other (up to `decimals`)."""
+    anchor = path.points[0]
+    columns = path.lines.columns()
+    digest = hashlib.blake2b(digest_size=16)
+    # + 0.0 turns -0.0 into 0.0
+    digest.update((np.round(path.points - anchor, decimals) + 0.0).tobytes())
+    for column in ("start", "end", "construction"):
+        digest.update(np.ascontiguousarray(columns[column]).tobytes())
+    return digest.digest(), anchor
+
+
 class PathExporter:
 
     def __init__(self, unit="") -> None:
@@ -76,6 +161,11 @@ class PathExporter:
         return self.p.extend(["l", x, y])
     
 
+    def parse_box_path_compact(self, path: Path, precision: int = 3) -> PathExporter:
+        """Same as `parse_box_path` but with compact path data, see `compact_path_data`"""
+        self.p.append(compact_path_data(path, precision))
+        return self
+
     def parse_box_path(self, path: Path) -> PathExporter:
         self.M(*path.points[0])
         for line in path.lines:
@@ -89,9 +179,18 @@ class BoxDrawing:
 
     MIN_STROKE = 0.2645833333 
 
-    def __init__(self, **svgargs) -> None:
+    # svg export only uses points and construction lines of a path
+    required_artifacts: Artifact = Artifact.GEOMETRY
+
+    def __init__(self, precision: int|None = None, dedup: bool = False, **svgargs) -> None:
+        """If `precision` is given, path data is written compact with at most `precision` decimals (see 
+        `compact_path_data`). With `dedup` parts that are translated copies of each other are written 
+        once in `<defs>` and placed with `<use>` (see `placements`). Other arguments are passed to 
+        `svgwrite.Drawing`."""
         self.paths: List[Path] = []        
         self.names: List[str] = []
+        self.precision: int|None = precision
+        self.dedup: bool = dedup
         self.svgargs = svgargs
         self.drawing: svg.Drawing = None
     
@@ -114,23 +213,147 @@ class BoxDrawing:
         ret = bbox.min(axis=0)
         ret = np.append(ret, [bbox.max(axis=0)]).reshape((2,2))
         return ret
+
+    def placements(self) -> List[Tuple[int, np.ndarray|None]]:
+        """For each part the index of the part defining its geometry and the offset to it. Parts without 
+        translated copies (or if `dedup` is not set) define their own geometry and have no offset."""
+        if not self.dedup:
+            return [(i, None) for i in range(len(self.paths))]
+        keys = [part_key(p) for p in self.paths]
+        first: Dict[bytes, int] = {}
+        count: Dict[bytes, int] = {}
+        for i, (key, _) in enumerate(keys):
+            first.setdefault(key, i)
+            count[key] = count.get(key, 0) + 1
+        ret = []
+        for i, (key, anchor) in enumerate(keys):
+            if count[key] == 1:
+                ret.append((i, None))
+            else:
+                ret.append((first[key], anchor - keys[first[key]][1]))
+        return ret
+
+    def definitions(self, placements: List[Tuple[int, np.ndarray|None]]) -> List[int]:
+        """Index of the parts written to `<defs>`"""
+        return sorted({source for source, offset in placements if offset is not None})
+
+    def definition_id(self, index: int) -> str:
+        return f"{self.names[index]}-part"
     
-    def save(self, path):
-        if self.drawing is None:
-            self._build_drawing(path)
-        for p, name in zip(self.paths, self.names):
-            self.export_path(p, name=name)
-        if isinstance(path, str):
-            with open(path, "w+", encoding="utf-8") as fd:
-                self.drawing.write(fd, pretty=True, indent=2)
-        else:
-            self.drawing.write(path, pretty=True, indent=2)
+    def save(self, path, minify: bool = False, compress: bool|None = None):
+        """Write the drawing to `path` (file name or text stream). `minify` writes the XML without 
+        indentation. For `compress` see `open_output`, by default `.svgz` files are compressed."""
+        # a new drawing on each call, thus the same parts can be saved in several formats
+        self._build_drawing(path)
+        placements = self.placements()
+        for index in self.definitions(placements):
+            self.drawing.defs.add(self.path_element(self.paths[index], self.definition_id(index)))
+        for (source, offset), p, name in zip(placements, self.paths, self.names):
+            if offset is None:
+                self.export_path(p, name=name)
+            else:
+                x, y = offset.tolist()
+                self.drawing.add(self.drawing.use(f"#{self.definition_id(source)}", insert=(x, y), id=name))
+        with open_output(path, compress) as fd:
+            self.drawing.write(fd, pretty=not minify, indent=2)
         
 
-    def export_path(self, path: Path, name: str):
+    def path_element(self, path: Path, name: str) -> spath.Path:
         p = PathExporter()
-        p.parse_box_path(path).z()
-        self.drawing.add(p.as_hairline(id=name))
+        if self.precision is None:
+            p.parse_box_path(path).z()
+        else:
+            p.parse_box_path_compact(path, self.precision).z()
+        return p.as_hairline(id=name)
+
+    def export_path(self, path: Path, name: str):
+        self.drawing.add(self.path_element(path, name))
+
+
+class StreamingBoxDrawing(BoxDrawing):
+    """Same output as `BoxDrawing`, but the SVG is written straight to the file handle without 
+    building a `svgwrite.Drawing`. The path data of each part is formatted in one go from its points.
+    Only the `profile` argument of `svgwrite.Drawing` is supported.
+    """
+
+    PROFILES = {"full": "1.1", "tiny": "1.2"}
+    # escaped in attribute values in addition to &, < and > (as done by svgwrite)
+    ATTRIBUTE_ENTITIES = {'"': "&quot;"}
+
+    def __init__(self, profile: str = "full", precision: int|None = None, dedup: bool = False) -> None:
+        if profile not in self.PROFILES:
+            raise ValueError(f"Unknown profile '{profile}', expected one of {list(self.PROFILES)}")
+        super().__init__(precision=precision, dedup=dedup, profile=profile)
+        self.profile = profile
+
+    @classmethod
+    def from_drawing(cls, drawing: BoxDrawing, **kwargs) -> StreamingBoxDrawing:
+        """Streaming export of the parts added to `drawing`. Profile, precision and dedup are taken 
+        from `drawing` if not given in `kwargs`."""
+        kwargs.setdefault("profile", drawing.svgargs.get("profile", "full"))
+        kwargs.setdefault("precision", drawing.precision)
+        kwargs.setdefault("dedup", drawing.dedup)
+        ret = cls(**kwargs)
+        for p, name in zip(drawing.paths, drawing.names):
+            ret.add(p, name)
+        return ret
+
+    def path_data(self, path: Path) -> str:
+        """SVG path data of `path`, see `PathExporter.parse_box_path` and `compact_path_data`"""
+        if self.precision is not None:
+            return f"{compact_path_data(path, self.precision)} z"
+        columns = path.lines.columns()
+        points = path.points
+        commands = np.where(columns["construction"], "M", "L").tolist()
+        x, y = points[columns["end"]].T.tolist()
+        start_x, start_y = points[0].tolist()
+        return " ".join([f"M {start_x} {start_y}", *map("{} {} {}".format, commands, x, y), "z"])
+
+    NAMESPACES = 'xmlns="http://www.w3.org/2000/svg" xmlns:ev="http://www.w3.org/2001/xml-events" xmlns:xlink="http://www.w3.org/1999/xlink"'
+
+    def _header(self, minify: bool = False) -> str:
+        max_dim = self.bbox()[1] + 30
+        attributes = (
+            f'baseProfile="{self.profile}" height="{max_dim[1]}mm" version="{self.PROFILES[self.profile]}" '
+            f'viewBox="0 0 {max_dim[0]} {max_dim[1]}" width="{max_dim[0]}mm"')
+        header = '<?xml version="1.0" encoding="utf-8" ?>\n'
+        # same attribute order and empty element style as svgwrite with and without pretty print
+        if minify:
+            return f'{header}<svg {attributes} {self.NAMESPACES}>'
+        return f'{header}<svg {self.NAMESPACES} {attributes}>\n'
+
+    def _attribute(self, value: str) -> str:
+        return escape(value, self.ATTRIBUTE_ENTITIES)
+
+    def write(self, fd, minify: bool = False):
+        indent, end = ("", " />") if minify else ("  ", "/>\n")
+        placements = self.placements()
+        definitions = self.definitions(placements)
+        fd.write(self._header(minify))
+        if not definitions:
+            fd.write("<defs />" if minify else "  <defs/>\n")
+        else:
+            fd.write("<defs>" if minify else "  <defs>\n")
+            for index in definitions:
+                fd.write(
+                    f'{indent * 2}<path d="{self.path_data(self.paths[index])}" fill="none" id="{self._attribute(self.definition_id(index))}" '
+                    f'stroke="#0000FF" stroke-width="{self.MIN_STROKE}"{end}')
+            fd.write("</defs>" if minify else "  </defs>\n")
+        for (source, offset), p, name in zip(placements, self.paths, self.names):
+            if offset is None:
+                fd.write(
+                    f'{indent}<path d="{self.path_data(p)}" fill="none" id="{self._attribute(name)}" '
+                    f'stroke="#0000FF" stroke-width="{self.MIN_STROKE}"{end}')
+            else:
+                x, y = offset.tolist()
+                fd.write(
+                    f'{indent}<use id="{self._attribute(name)}" x="{x}" '
+                    f'xlink:href="#{self._attribute(self.definition_id(source))}" y="{y}"{end}')
+        fd.write("</svg>" if minify else "</svg>\n")
+
+    def save(self, path, minify: bool = False, compress: bool|None = None):
+        with open_output(path, compress) as fd:
+            self.write(fd, minify)
 
 
 # if __name__ == "__main__":
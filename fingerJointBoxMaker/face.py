@@ -1,13 +1,15 @@
 from __future__ import annotations
 import enum
-from typing import Any, Dict, List, Protocol
+from typing import Any, Dict, List, NamedTuple, Protocol, Tuple
 
-from fingerJointBoxMaker.edge import FingerJointEdge, EdgePathBuilder, StraightLineEdge
+from fingerJointBoxMaker.dimension import is_numeric_mode
+from fingerJointBoxMaker.edge import FingerJointEdge, EdgePathBuilder, StraightLineEdge, consumer_key
 from fingerJointBoxMaker.geometry import Path, PathConcatError, Plane, Line, PathBuilder, PathConsumer
 
 from fingerJointBoxMaker.transform import Transform, create_transform, mat_reflect_x, mat_reflect_y, mat_shift, mat_rot_90
 from fingerJointBoxMaker.export.plot import plot_path
 import logging
+from numpy.typing import NDArray
 
 class FaceConstraintProvider(Protocol):
 
@@ -16,16 +18,45 @@ class FaceConstraintProvider(Protocol):
         ...
 
 
+class Artifact(enum.Flag):
+    """Build artifacts a consumer of a face path (e.g. an exporter) requires"""
+    GEOMETRY = enum.auto()      # points and lines
+    DIM_NAMES = enum.auto()     # names of the `Dim` objects of lines, see `numeric_mode`
+    CONSTRAINTS = enum.auto()   # everything added by `Face.constraint_providers`
+    ALL = GEOMETRY | DIM_NAMES | CONSTRAINTS
+
+
+class ArtifactConsumer(Protocol):
+
+    required_artifacts: Artifact
+
+
+class ConstraintReduction(NamedTuple):
+    """Number of constraints of a face before and after `minimize_constraints`"""
+    face: str
+    before: int
+    after: int
+
+    @property
+    def removed(self) -> int:
+        return self.before - self.after
+
+
 class FaceType(enum.Enum):
     BOTTOM_TOP = 1
     FRONT_BACK = 2
     SIDE_LEFT_RIGHT = 3
 
 class FacePathBuilder:
-    """Concatenate all paths genreated by the provided PathBuilders"""
+    """Concatenate all paths genreated by the provided PathBuilders. 
+    
+    In `symmetric` mode the path of each distinct edge is only built once per face. Opposite sides 
+    of the face, which are reflections or rotations of each other, share it under different transforms.
+    """
 
-    def __init__(self, *path_builder: EdgePathBuilder) -> None:
+    def __init__(self, *path_builder: EdgePathBuilder, symmetric: bool = False) -> None:
         self.path_builder: List[EdgePathBuilder] = list(path_builder)
+        self.symmetric: bool = symmetric
     
     def add(self, edge_path_builder: EdgePathBuilder) -> FacePathBuilder:
         self.path_builder.append(edge_path_builder)
@@ -56,17 +87,45 @@ class FacePathBuilder:
         curr.add_transform_mat(mat_rot_90, mat_reflect_x).reverse_path()
         return curr
 
+
+    def cache_key(self) -> tuple|None:
+        keys = [b.cache_key() for b in self.path_builder]
+        if any(k is None for k in keys):
+            return None
+        return tuple(keys)
     
     def build(self) -> Path:
+        """Build the face in a single pass. The callbacks of each `EdgePathBuilder` are folded into one 
+        matrix and a reverse flag (see `EdgePathBuilder.composed`), which are applied while the edge 
+        paths are copied into the face path. Builders with other callbacks are called as usual."""
         logging.debug("Build Face:")
-        path: Path = self.path_builder[0]()
-        if len(self.path_builder) > 1:
-            for idx, p_builder in enumerate(self.path_builder[1:]):
-                logging.debug(f"build append path {idx+1}/{len(self.path_builder)}")
-                _p: Path = p_builder()
-                path = path.concat(_p, create_connecting_line=p_builder.concat_with_connecting_line)
-                
-        return path
+        paths: List[Path] = []
+        transforms: List[NDArray|None] = []
+        reverse: List[bool] = []
+        edge_paths: Dict[Any, Path] = {}
+        for idx, p_builder in enumerate(self.path_builder):
+            logging.debug(f"build path {idx+1}/{len(self.path_builder)}")
+            composed = p_builder.composed()
+            if composed is None:
+                paths.append(p_builder())
+                composed = (None, False)
+            elif self.symmetric:
+                # `concat_many` does not modify the paths, thus equal edges can share one path
+                edge_key = p_builder.edge.cache_key()
+                edge_key = ("id", id(p_builder.edge)) if edge_key is None else edge_key
+                if edge_key not in edge_paths:
+                    edge_paths[edge_key] = p_builder.edge.make_path()
+                paths.append(edge_paths[edge_key])
+            else:
+                paths.append(p_builder.edge.make_path())
+            transforms.append(composed[0])
+            reverse.append(composed[1])
+
+        return Path.concat_many(
+            paths, 
+            create_connecting_line=[b.concat_with_connecting_line for b in self.path_builder],
+            transforms=transforms, 
+            reverse=reverse)
 
 
 class Face:
@@ -78,7 +137,7 @@ class Face:
         p2 = EdgePathBuilder(e2).add_transform_mat(mat_shift(dx=e1.length), mat_rot_90)
         p3 = EdgePathBuilder(e1).add_transform_mat(mat_shift(dy=e2.length), mat_reflect_x).reverse_path()
         p4 = EdgePathBuilder(e2).add_transform_mat(mat_rot_90, mat_reflect_x).reverse_path()
-        face_builder = FacePathBuilder(p1, p2, p3, p4)
+        face_builder = FacePathBuilder(p1, p2, p3, p4, symmetric=True)
         return cls(face_builder = face_builder, name=name, plane=plane)
 
     @classmethod
@@ -87,7 +146,7 @@ class Face:
         p2 = EdgePathBuilder(e2).add_transform_mat(mat_shift(dx=e1.length), mat_rot_90)
         p3 = EdgePathBuilder(StraightLineEdge(e1.length)).add_transform_mat(mat_shift(dy=e2.length), mat_reflect_x).reverse_path()
         p4 = EdgePathBuilder(e2).add_transform_mat(mat_rot_90, mat_reflect_x).reverse_path()
-        face_builder = FacePathBuilder(p1, p2, p3, p4)
+        face_builder = FacePathBuilder(p1, p2, p3, p4, symmetric=True)
         return cls(face_builder = face_builder, name=name, plane=plane)
 
 
@@ -100,6 +159,23 @@ class Face:
         self.constraint_providers: List[FaceConstraintProvider] = []
         self.post_path_consumer: List[PathConsumer] = []
         self.plane: Plane = plane
+        # set by the `minimize_constraints` provider
+        self.constraint_reduction: ConstraintReduction|None = None
+        # (artifacts, numeric mode) -> (cache key, frozen path), see `build_path`
+        self._path_cache: Dict[tuple, Tuple[tuple, Path]] = {}
+
+    def cache_key(self) -> tuple|None:
+        """Structural key of everything `build_path` depends on: face builder, post path consumers, 
+        constraint providers, name and plane. None if some part has no key (see `consumer_key`)."""
+        builder = self.face_builder.cache_key()
+        consumers = tuple(consumer_key(c) for c in self.post_path_consumer)
+        providers = tuple(consumer_key(c) for c in self.constraint_providers)
+        if builder is None or any(k is None for k in consumers + providers):
+            return None
+        return (builder, consumers, providers, self.name, self.plane)
+
+    def clear_cache(self):
+        self._path_cache.clear()
 
     def apply_constrains(self, path: Path) -> Path:
 
@@ -108,7 +184,21 @@ class Face:
         
         return path
 
-    def build_path(self) -> Path:
+    def build_path(self, artifacts: Artifact = Artifact.ALL, use_cache: bool = True) -> Path:
+        """Build path of face. Constraint providers only run if `Artifact.CONSTRAINTS` is requested. 
+        Note: providers may also add construction lines for CAD sketches (e.g. `add_sktech_offset`).
+
+        If `use_cache` is set the result is memoized. Later calls return a copy of it as long as 
+        `cache_key` is unchanged, thus mutating the builder, consumer or provider lists invalidates it.
+        Functions are part of the key by identity, callables which may hold state (closures, callable 
+        objects) disable the cache (see `consumer_key`).
+        """
+        key = self.cache_key() if use_cache else None
+        slot = (artifacts, is_numeric_mode())
+        if key is not None:
+            cached = self._path_cache.get(slot)
+            if cached is not None and cached[0] == key:
+                return cached[1].copy(deep=False)
 
         logging.debug(f"Build path for face '{self.name}'")
         path: Path = self.face_builder.build()
@@ -116,6 +206,9 @@ class Face:
         for consumer in self.post_path_consumer:
             path = consumer(path)
 
-        path = self.apply_constrains(path)
+        if Artifact.CONSTRAINTS in artifacts:
+            path = self.apply_constrains(path)
 
+        if key is not None:
+            self._path_cache[slot] = (key, path.copy(deep=False).freeze())
         return path
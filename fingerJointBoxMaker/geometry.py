@@ -1,14 +1,14 @@
 from __future__ import annotations
 import enum
-from typing import Any, List, Tuple, Callable, Protocol
+from typing import Any, Dict, List, Tuple, Callable, Protocol
 import copy
 
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 import numpy as np
 
 from fingerJointBoxMaker.dimension import Dim
 from fingerJointBoxMaker.constrains import Constraint, Transform
-from fingerJointBoxMaker.transform import create_transform, mat_rot_90, mat_shift
+from fingerJointBoxMaker.transform import MatrixTransform, create_transform, mat_rot_90, mat_shift, transform_points
 
 class Plane(enum.Enum):
     XY = 1
@@ -111,6 +111,433 @@ class Line:
     def end(self) -> NDArray:
         return self.line[1]
 
+class PathLine(Line):
+    """Lightweight view on the line at `index` of a `LineTable`. Geometry is read from the
+    points of the path owning the table. Setting `dim` or the construction flag writes
+    through to the table."""
+
+    def __init__(self, table: LineTable, index: int) -> None:
+        self.table: LineTable = table
+        self.index: int = index
+
+    @property
+    def line(self) -> NDArray:
+        return self.table.path.points[[self.table.start[self.index], self.table.end[self.index]]]
+
+    @property
+    def dim(self) -> Dim|None:
+        return self.table.dims[self.index]
+
+    @dim.setter
+    def dim(self, dim: Dim|None):
+        self.table.dims[self.index] = dim
+
+    @property
+    def move_to(self) -> bool:
+        return bool(self.table.construction[self.index])
+
+    @move_to.setter
+    def move_to(self, move_to: bool):
+        self.table.construction[self.index] = move_to
+
+    @property
+    def orientation(self) -> Orientation:
+        return Orientation(self.table.orientation[self.index])
+
+    @property
+    def level(self) -> float:
+        return self.table.level[self.index]
+
+    def reverse(self, copy = True) -> Line:
+        if copy:
+            return super().reverse(copy=True)
+        start = self.table.start[self.index]
+        self.table.start[self.index] = self.table.end[self.index]
+        self.table.end[self.index] = start
+        return self
+
+
+class LineTable:
+    """Struct-of-arrays storage for the lines of a `Path`. Each line is stored as start/end
+    index into the points of the path together with its orientation code, level, construction 
+    flag and an optional `Dim`. `Line` objects are only created on access as `PathLine` views.
+    """
+
+    INITIAL_CAPACITY: int = 16
+
+    COLUMNS: Tuple[Tuple[str, Any], ...] = (
+        ("start", np.intp),
+        ("end", np.intp),
+        ("orientation", np.int8),
+        ("level", float),
+        ("construction", bool),
+    )
+
+    def __init__(self, path: Path) -> None:
+        self.path: Path = path
+        self._size: int = 0
+        self._columns: dict = {name: np.empty(self.INITIAL_CAPACITY, dtype=dtype) for name, dtype in self.COLUMNS}
+        self.dims: List[Dim|None] = []
+
+    @classmethod
+    def from_columns(cls, path: Path, columns: dict, dims: List[Dim|None]) -> LineTable:
+        table = cls(path)
+        size = len(dims)
+        if size > table.capacity:
+            table._columns = {name: np.empty(size, dtype=dtype) for name, dtype in cls.COLUMNS}
+        for name, _ in cls.COLUMNS:
+            table._columns[name][:size] = columns[name]
+        table.dims = list(dims)
+        table._size = size
+        return table
+
+    @property
+    def capacity(self) -> int:
+        return len(self._columns["start"])
+
+    @property
+    def start(self) -> NDArray:
+        return self._columns["start"][:self._size]
+
+    @property
+    def end(self) -> NDArray:
+        return self._columns["end"][:self._size]
+
+    @property
+    def orientation(self) -> NDArray:
+        """Orientation codes, see `Orientation.value`"""
+        self.path._apply_pending_transform()
+        return self._columns["orientation"][:self._size]
+
+    @property
+    def level(self) -> NDArray:
+        self.path._apply_pending_transform()
+        return self._columns["level"][:self._size]
+
+    @property
+    def construction(self) -> NDArray:
+        return self._columns["construction"][:self._size]
+
+    def columns(self) -> dict:
+        """Raw columns of the table. Orientation and level are not updated for pending transforms of the path."""
+        return {name: self._columns[name][:self._size] for name, _ in self.COLUMNS}
+
+    def _grow(self):
+        for name, dtype in self.COLUMNS:
+            column = np.empty(2*max(self.capacity, 1), dtype=dtype)
+            column[:self._size] = self._columns[name][:self._size]
+            self._columns[name] = column
+
+    def reserve(self, capacity: int):
+        """Grow columns such that at least `capacity` lines fit without reallocation."""
+        if capacity > self.capacity:
+            for name, dtype in self.COLUMNS:
+                column = np.empty(capacity, dtype=dtype)
+                column[:self._size] = self._columns[name][:self._size]
+                self._columns[name] = column
+
+    def append(self, start: int, end: int, dim: Dim|None = None, construction: bool = False) -> PathLine:
+        p1 = self.path.points[start]
+        p2 = self.path.points[end]
+        if (p1 == p2).all():
+            raise ValueError("line with length 0 not allowed.")
+
+        if self._size == self.capacity:
+            self._grow()
+        idx = self._size
+        self._columns["start"][idx] = start
+        self._columns["end"][idx] = end
+        if p1[1] == p2[1]:
+            self._columns["orientation"][idx] = Orientation.Horizontal.value
+            self._columns["level"][idx] = p1[1]
+        elif p1[0] == p2[0]:
+            self._columns["orientation"][idx] = Orientation.Vertical.value
+            self._columns["level"][idx] = p1[0]
+        else:
+            self._columns["orientation"][idx] = Orientation.Other.value
+            self._columns["level"][idx] = np.nan
+        self._columns["construction"][idx] = construction
+        self.dims.append(dim)
+        self._size += 1
+        return PathLine(self, idx)
+
+    def append_many(self, start: NDArray, end: NDArray, dims: List[Dim|None], construction: NDArray|bool = False):
+        """Append one line per entry of the `start` and `end` point index arrays."""
+        points = self.path.points
+        if (points[start] == points[end]).all(axis=1).any():
+            raise ValueError("line with length 0 not allowed.")
+
+        first = self._size
+        size = first + len(start)
+        if self.capacity < size:
+            self.reserve(max(size, 2*self.capacity))
+        self._columns["start"][first:size] = start
+        self._columns["end"][first:size] = end
+        self._columns["construction"][first:size] = construction
+        self.dims.extend(dims)
+        self._size = size
+        self.update_geometry(first)
+
+    def extend(self, other: LineTable, offset: int = 0) -> LineTable:
+        """Append all lines of `other` with point indices shifted by `offset`"""
+        size = self._size + len(other)
+        if self.capacity < size:
+            self.reserve(max(size, 2*self.capacity))
+        for name, column in other.columns().items():
+            self._columns[name][self._size:size] = column
+        self._columns["start"][self._size:size] += offset
+        self._columns["end"][self._size:size] += offset
+        self.dims.extend(other.dims)
+        self._size = size
+        return self
+
+    def pop(self):
+        if self._size == 0:
+            raise IndexError("pop from empty line table")
+        self._size -= 1
+        self.dims.pop()
+
+    def freeze(self):
+        """Make columns and dims read-only"""
+        for column in self._columns.values():
+            column.flags.writeable = False
+        self.dims = tuple(self.dims)
+
+    def copy(self, path: Path) -> LineTable:
+        """Copy of table for `path`, which must contain the same number of points"""
+        return LineTable.from_columns(path, self.columns(), self.dims)
+
+    def reversed(self, path: Path) -> LineTable:
+        """Table with reversed line order and direction for `path`, which contains the points in reverse order"""
+        last = len(path) - 1
+        columns = {name: column[::-1] for name, column in self.columns().items()}
+        columns["start"], columns["end"] = last - columns["end"], last - columns["start"]
+        return LineTable.from_columns(path, columns, self.dims[::-1])
+
+    def update_geometry(self, first: int = 0):
+        """Recompute orientation and level of all lines, starting at index `first`, from the current points of the path."""
+        points = self.path.points
+        start = points[self.start[first:]]
+        end = points[self.end[first:]]
+        horizontal = end[:, 1] == start[:, 1]
+        vertical = ~horizontal & (end[:, 0] == start[:, 0])
+        orientation = self._columns["orientation"][first:self._size]
+        orientation[:] = Orientation.Other.value
+        orientation[vertical] = Orientation.Vertical.value
+        orientation[horizontal] = Orientation.Horizontal.value
+        self._columns["level"][first:self._size] = np.where(horizontal, start[:, 1], np.where(vertical, start[:, 0], np.nan))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        return (PathLine(self, i) for i in range(self._size))
+
+    def _index(self, idx: int) -> int:
+        if idx < 0:
+            idx += self._size
+        if idx < 0 or idx >= self._size:
+            raise IndexError("line index out of range")
+        return idx
+
+    def __getitem__(self, idx: int|slice) -> PathLine|List[PathLine]:
+        if isinstance(idx, slice):
+            return [PathLine(self, i) for i in range(*idx.indices(self._size))]
+        return PathLine(self, self._index(idx))
+
+    def __setitem__(self, idx: int, line: Line):
+        """Take over `dim` and construction flag of `line`. The geometry is defined by the path and must match."""
+        idx = self._index(idx)
+        if isinstance(line, PathLine) and line.table is self and line.index == idx:
+            return
+        if not (line.line == PathLine(self, idx).line).all():
+            raise ValueError("line does not match geometry of the path at this index.")
+        self.dims[idx] = line.dim
+        self.construction[idx] = line.is_construction
+
+
+class ConstraintTable:
+    """Constraints of a `Path` stored as type code and line indices in CSR layout (`indptr`, `indices`). 
+    Constraint objects are only created on access and refer to the lines of the owning path, thus 
+    transforming the path does not touch its constraints. 
+    
+    Constraint classes are registered with `register` and must provide `get_lines()` and 
+    `from_lines(lines, path)`. Other constraints, or constraints with lines that are not part of 
+    the path, are stored as objects and are transformed with the path.
+    """
+
+    OBJECT: int = -1
+    INITIAL_CAPACITY: int = 16
+
+    _types: List[type] = []
+    _codes: Dict[type, int] = {}
+
+    @classmethod
+    def register(cls, constraint_cls: type) -> type:
+        """Class decorator to store constraints of type `constraint_cls` by line index."""
+        if constraint_cls not in cls._codes:
+            cls._codes[constraint_cls] = len(cls._types)
+            cls._types.append(constraint_cls)
+        return constraint_cls
+
+    @classmethod
+    def code_of(cls, constraint_cls: type) -> int:
+        return cls._codes[constraint_cls]
+
+    @classmethod
+    def type_of(cls, code: int) -> type:
+        return cls._types[code]
+
+    @classmethod
+    def registered_types(cls) -> List[type]:
+        """Registered constraint classes, ordered by code"""
+        return list(cls._types)
+
+    @classmethod
+    def from_rows(cls, path: Path, codes: ArrayLike, indptr: ArrayLike, indices: ArrayLike, objects: List[Constraint] = ()) -> ConstraintTable:
+        """Table for `path` from rows given in CSR layout, `indptr` starts with 0"""
+        table = cls(path)
+        table._append_rows(
+            np.asarray(codes, dtype=np.int8), 
+            np.asarray(indptr, dtype=np.intp), 
+            np.asarray(indices, dtype=np.intp))
+        table.objects = list(objects)
+        return table
+
+    def __init__(self, path: Path) -> None:
+        self.path: Path = path
+        self._size: int = 0
+        self._codes_column: NDArray = np.empty(self.INITIAL_CAPACITY, dtype=np.int8)
+        self._indptr: NDArray = np.zeros(self.INITIAL_CAPACITY + 1, dtype=np.intp)
+        self._indices: NDArray = np.empty(2*self.INITIAL_CAPACITY, dtype=np.intp)
+        self.objects: List[Constraint] = []
+
+    @property
+    def codes(self) -> NDArray:
+        return self._codes_column[:self._size]
+
+    @property
+    def indptr(self) -> NDArray:
+        return self._indptr[:self._size + 1]
+
+    @property
+    def indices(self) -> NDArray:
+        return self._indices[:self._indptr[self._size]]
+
+    def _reserve(self, rows: int, indices: int):
+        if rows > len(self._codes_column):
+            rows = max(rows, 2*len(self._codes_column))
+            codes = np.empty(rows, dtype=np.int8)
+            codes[:self._size] = self.codes
+            indptr = np.zeros(rows + 1, dtype=np.intp)
+            indptr[:self._size + 1] = self.indptr
+            self._codes_column, self._indptr = codes, indptr
+        if indices > len(self._indices):
+            column = np.empty(max(indices, 2*len(self._indices)), dtype=np.intp)
+            column[:self._indptr[self._size]] = self.indices
+            self._indices = column
+
+    def _append_rows(self, codes: NDArray, indptr: NDArray, indices: NDArray):
+        """Append rows given in CSR layout, `indptr` starts with 0"""
+        rows = self._size + len(codes)
+        first = self._indptr[self._size]
+        self._reserve(rows, first + len(indices))
+        self._codes_column[self._size:rows] = codes
+        self._indptr[self._size + 1:rows + 1] = indptr[1:] + first
+        self._indices[first:first + len(indices)] = indices
+        self._size = rows
+
+    def _line_indices(self, lines: List[Line]) -> List[int]|None:
+        out = []
+        for line in lines:
+            if not isinstance(line, PathLine) or line.table is not self.path.lines:
+                return None
+            out.append(line.index)
+        return out
+
+    def append(self, constraint: Constraint):
+        code = self._codes.get(type(constraint))
+        indices = None if code is None else self._line_indices(constraint.get_lines())
+        if indices is None:
+            code = self.OBJECT
+            indices = [len(self.objects)]
+            self.objects.append(constraint)
+        self._append_rows(np.array([code]), np.array([0, len(indices)]), np.array(indices, dtype=np.intp))
+
+    def add_many(self, constraint_cls: type, line_indices: NDArray) -> ConstraintTable:
+        """Add one constraint of type `constraint_cls` per row of the (-1, arity) `line_indices` array"""
+        line_indices = np.asarray(line_indices, dtype=np.intp)
+        rows, arity = line_indices.shape
+        self._append_rows(
+            np.full(rows, self.code_of(constraint_cls)), 
+            np.arange(rows + 1)*arity, 
+            line_indices.reshape(-1))
+        return self
+
+    def extend(self, other: ConstraintTable, line_offset: int = 0, transform: Transform|None = None) -> ConstraintTable:
+        """Append constraints of `other` with line indices shifted by `line_offset`. Object constraints 
+        are transformed by `transform`"""
+        indices = other.indices + line_offset
+        is_object = other.codes == self.OBJECT
+        object_rows = other.indptr[:-1][is_object]
+        indices[object_rows] = other.indices[object_rows] + len(self.objects)
+        if transform is None:
+            self.objects.extend(other.objects)
+        else:
+            self.objects.extend(c.apply_transform(transform) if hasattr(c, "apply_transform") else c for c in other.objects)
+        self._append_rows(other.codes, other.indptr, indices)
+        return self
+
+    def copy(self, path: Path, transform: Transform|None = None) -> ConstraintTable:
+        """Copy of table for `path` with the same lines. Object constraints are transformed by `transform`"""
+        table = ConstraintTable(path)
+        table._append_rows(self.codes, self.indptr, self.indices)
+        if transform is None:
+            table.objects = list(self.objects)
+        else:
+            # constraints without `apply_transform` do not depend on geometry
+            table.objects = [c.apply_transform(transform) if hasattr(c, "apply_transform") else c for c in self.objects]
+        return table
+
+    def reversed(self, path: Path) -> ConstraintTable:
+        """Table with reversed constraint order for `path`, which contains the lines in reverse order"""
+        table = ConstraintTable(path)
+        last = len(path.lines) - 1
+        indptr = self.indptr
+        rows = [self.indices[indptr[i]:indptr[i+1]] for i in range(self._size - 1, -1, -1)]
+        codes = self.codes[::-1]
+        rows = [r if c == self.OBJECT else last - r for r, c in zip(rows, codes)]
+        lengths = np.array([len(r) for r in rows], dtype=np.intp)
+        table._append_rows(
+            codes, 
+            np.append(0, np.cumsum(lengths)), 
+            np.concatenate(rows) if rows else np.empty(0, dtype=np.intp))
+        table.objects = list(self.objects)
+        return table
+
+    def freeze(self):
+        for column in (self._codes_column, self._indptr, self._indices):
+            column.flags.writeable = False
+        self.objects = tuple(self.objects)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, idx: int) -> Constraint:
+        if idx < 0:
+            idx += self._size
+        if idx < 0 or idx >= self._size:
+            raise IndexError("constraint index out of range")
+        code = self._codes_column[idx]
+        indices = self._indices[self._indptr[idx]:self._indptr[idx+1]]
+        if code == self.OBJECT:
+            return self.objects[indices[0]]
+        return self._types[code].from_lines([PathLine(self.path.lines, int(i)) for i in indices], self.path)
+
+    def __iter__(self):
+        return (self[i] for i in range(self._size))
+
+
 class PathConsumer(Protocol):
 
     def __call__(self, path: Path) -> Path:
@@ -124,17 +551,30 @@ class PathBuilder(Protocol):
         ...
 
 class PathConsumerByTransfrom():
+    """Transform the path. Returns a transformed copy, with `copy=False` the path is transformed in place 
+    (for builders which own the path, e.g. `EdgePathBuilder` and the post consumers of a `Face`)."""
 
     @classmethod
-    def from_mat(cls, *mat: NDArray):
+    def from_mat(cls, *mat: NDArray, copy: bool = True):
         t  = create_transform(*mat)
-        return cls(t)
+        return cls(t, copy=copy)
 
-    def __init__(self, transfrom: Transform) -> None:
+    def __init__(self, transfrom: Transform, copy: bool = True) -> None:
         self.transfrom = transfrom
+        self.copy = copy
+
+    def __call__(self, path: Path) -> Path:
+        return path.transform(self.transfrom, copy=self.copy)
+
+
+class PathConsumerReverse():
+    """Reverse the path. Returns a reversed copy, with `copy=False` the path is reversed in place."""
+
+    def __init__(self, copy: bool = True) -> None:
+        self.copy = copy
 
     def __call__(self, path: Path) -> Path:
-        return path.transform(self.transfrom)
+        return path.reverse(copy=self.copy)
 
 
 class PathConcatError(Exception):
@@ -143,10 +583,61 @@ class PathConcatError(Exception):
 
 class Path:
 
+    # initial number of points the point buffer can hold before it needs to grow
+    INITIAL_CAPACITY: int = 16
+
     def __init__(self) -> None:
-        self.points: NDArray = np.array([[]])
-        self.lines: List[Line] = []
-        self.constraints: List[Constraint] = []
+        self._buffer: NDArray = np.empty((self.INITIAL_CAPACITY, 2))
+        self._size: int = 0
+        self._lines: LineTable = LineTable(self)
+        self._constraints: ConstraintTable = ConstraintTable(self)
+        # composed matrix of transforms not yet applied to the point buffer
+        self._pending: NDArray|None = None
+        self._frozen: bool = False
+
+    @property
+    def lines(self) -> LineTable:
+        return self._lines
+
+    @property
+    def constraints(self) -> ConstraintTable:
+        return self._constraints
+
+    @constraints.setter
+    def constraints(self, constraints: List[Constraint]|ConstraintTable):
+        self._assert_not_frozen()
+        if isinstance(constraints, ConstraintTable) and constraints.path is self:
+            self._constraints = constraints
+            return
+        self._constraints = ConstraintTable(self)
+        self.append_constraint(*constraints)
+
+    @property
+    def points(self) -> NDArray:
+        """View of the used part of the point buffer as (-1, 2) array. Pending transforms are applied first."""
+        self._apply_pending_transform()
+        return self._buffer[:self._size]
+
+    @points.setter
+    def points(self, points: NDArray):
+        """Replace all points of the path. The given points are copied into a new buffer."""
+        self._assert_not_frozen()
+        points = np.array(points, dtype=float).reshape((-1, 2))
+        self._buffer = np.empty((max(len(points), self.INITIAL_CAPACITY), 2))
+        self._buffer[:len(points)] = points
+        self._size = len(points)
+        self._pending = None
+
+    @property
+    def capacity(self) -> int:
+        """Number of points the path can hold before the point buffer is reallocated"""
+        return len(self._buffer)
+
+    def _grow(self):
+        """Double the capacity of the point buffer. Appending points is thus amortized O(1)"""
+        buffer = np.empty((2*max(self.capacity, 1), 2))
+        buffer[:self._size] = self._buffer[:self._size]
+        self._buffer = buffer
     
     @classmethod
     def zero(cls):
@@ -166,27 +657,74 @@ class Path:
         b = self.bounding_box()
         return (b[1, :] - b[0, :])[1]
 
-    def copy(self) -> Path:
-        return copy.deepcopy(self)
+    def copy(self, deep: bool = True) -> Path:
+        """Copy of path. A shallow copy only copies the point buffer and line table, `Dim` objects 
+        and constraints are shared with this path."""
+        if deep:
+            return copy.deepcopy(self)
+        new_path = Path()
+        new_path.points = self._buffer[:self._size]
+        new_path._pending = self._pending
+        new_path._lines = self._lines.copy(new_path)
+        new_path._constraints = self._constraints.copy(new_path)
+        return new_path
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self) -> Path:
+        """Make path immutable. Pending transforms are applied and buffers are set read-only. 
+        Use `copy` or `transform` to derive a mutable path."""
+        self._apply_pending_transform()
+        self._buffer.flags.writeable = False
+        self._lines.freeze()
+        self._constraints.freeze()
+        self._frozen = True
+        return self
+
+    def _assert_not_frozen(self):
+        if self._frozen:
+            raise ValueError("path is frozen and cannot be changed.")
 
     def __len__(self) -> int:
-        return len(self.points)
+        return self._size
     
     def get_origin_offset(self) -> NDArray:
         return self.points[0] - np.array([0., 0.])
     
-    def transform(self, t: Transform) -> Path:
-        """Create copy of path with transform applied to `points`, `lines` and `constrains` (if the contain lines)"""
-      
-        points = t(points=np.array(self.points))
-        lines = [l.transform(t) for l in self.lines]
-        constraints = [c.apply_transform(t) for c in self.constraints]
-        new_path = Path()
-        new_path.points = points
-        new_path.lines = lines
-        new_path.constraints = constraints
+    def transform(self, t: Transform, copy: bool = True) -> Path:
+        """Create copy of path with transform applied to `points` and `lines`. Constraints refer to lines
+        by index and need no transform, except for constraints stored as objects (see `ConstraintTable`).
+        If `copy` is False the path itself is transformed.
+
+        Transforms exposing their matrix as `mat` (see `create_transform`) are applied lazily. They are 
+        composed into a pending matrix which is applied in a single pass once the points are read.
+        """
+        if not copy:
+            self._assert_not_frozen()
+        mat = getattr(t, "mat", None)
+        new_path = Path() if copy else self
+        if mat is not None:
+            pending = mat if self._pending is None else np.matmul(mat, self._pending)
+            if copy:
+                new_path.points = self._buffer[:self._size]
+            new_path._pending = pending
+        else:
+            new_path.points = t(points=np.array(self.points))
+        if copy:
+            new_path._lines = self._lines.copy(new_path)
+        if mat is None:
+            new_path._lines.update_geometry()
+        new_path._constraints = self._constraints.copy(new_path, transform=t)
         return  new_path
 
+    def _apply_pending_transform(self):
+        if self._pending is not None:
+            mat, self._pending = self._pending, None
+            self._buffer[:self._size] = transform_points(self._buffer[:self._size], mat=mat)
+            self._lines.update_geometry()
+
     def homogenous_poins(self) -> NDArray:
         return np.append(self.points.T, np.ones(self.points.T)).reshape((3, -1))
 
@@ -195,8 +733,9 @@ class Path:
         return  self.points[-1]
     
     def append_constraint(self, *args):
+        self._assert_not_frozen()
         for c in args:
-            self.constraints.append(c)
+            self._constraints.append(c)
 
     def last_line(self) -> Line:
         return self.lines[-1]
@@ -206,6 +745,7 @@ class Path:
         return self.consume_last(lambda x: x.set_as_construction_line())
 
     def consume_last(self, func: LastLineConsumer) -> Path:
+        self._assert_not_frozen()
         line: Line = func(self.last_line())
         self.lines[-1] = line
         return self
@@ -233,16 +773,40 @@ class Path:
         return self
 
     def clear(self):
-        self.points.clear()
+        self._assert_not_frozen()
+        self._size = 0
 
     def _make_line(self, dim: Dim|None=None):
         if len(self.points) < 1:
             raise ValueError("path must contain at least to points to create a line")
-        line = Line(self.points[-2], self.points[-1])
-        line.dim = dim
-        self.lines.append(line)
+        self._lines.append(len(self.points) - 2, len(self.points) - 1, dim)
         return Line
 
+    def add_segments(self, deltas: NDArray, dims: List[Dim|None]|None = None, construction: NDArray|bool = False) -> Path:
+        """Append one line per row of `deltas` (-1, 2), each relative to the end of the previous line. The 
+        points are accumulated in a single pass and are identical to consecutive calls of `h`, `v` or `line_to_rel`.
+        """
+        self._assert_not_frozen()
+        self._apply_pending_transform()
+        if self._size == 0:
+            raise ValueError("Path has no initial point")
+        deltas = np.asarray(deltas, dtype=float).reshape((-1, 2))
+        if dims is None:
+            dims = [None]*len(deltas)
+        elif len(dims) != len(deltas):
+            raise ValueError(f"expected one dim per segment. Got {len(dims)} dims for {len(deltas)} segments")
+
+        first = self._size
+        size = first + len(deltas)
+        while self.capacity < size:
+            self._grow()
+        points = self._buffer[first-1:size]
+        points[1:] = deltas
+        np.cumsum(points, axis=0, out=points)
+        self._size = size
+        self._lines.append_many(np.arange(first-1, size-1), np.arange(first, size), dims, construction)
+        return self
+
     def add_to_last(self, p: np.array):
         if len(self.points) == 0:
             raise ValueError("Path has no initial point")
@@ -250,19 +814,21 @@ class Path:
         self._append_points(p[0], p[1])
 
     def add_point(self, x, y):
-        if self.points.shape == (1, 0):
-            self.points = np.array([[x, y]])
-        else:
-            self._append_points(x, y)
+        self._append_points(x, y)
         return self
 
     def _append_points(self, x, y):
-        if not any( [isinstance(x, i) for i in [int, float]]):
+        if not isinstance(x, (int, float, np.integer, np.floating)):
             raise ValueError(f"x value is not an int or float. Got {type(x)}")
-        if not any( [isinstance(y, i) for i in [int, float]]):
+        if not isinstance(y, (int, float, np.integer, np.floating)):
             raise ValueError(f"y value is not an int or float. Got {type(y)}")
-        
-        self.points = np.append(self.points, [[x, y]], axis=0)
+
+        self._assert_not_frozen()
+        self._apply_pending_transform()
+        if self._size == self.capacity:
+            self._grow()
+        self._buffer[self._size] = (x, y)
+        self._size += 1
 
     def _get_vec_dim(self, x, y) -> Tuple[np.array, Dim|None]:
         _dim = None
@@ -369,67 +935,110 @@ class Path:
         """
         if since_line > self.line_count or since_line < 0:
             raise ValueError(f"since_line must be within interval [0, {self.line_count}), i.e number of lines in path.")
-        out = []
-        for i in range(since_line, self.line_count):
-            line = self.lines[i]
-            if line.orientation == orientation and line.level == level:
-                out.append(line)
+        mask = (self._lines.orientation[since_line:] == orientation.value) & (self._lines.level[since_line:] == level)
+        out = [self._lines[i] for i in np.flatnonzero(mask) + since_line]
         if constraint_f is not None:
-            self.constraints.append(constraint_f(out))
+            self.append_constraint(constraint_f(out))
         return out
     
     
     def remove_last_line(self) -> Path:
-        l = self.lines[-1]
-        del self.lines[-1]
-        self.points = np.delete(self.points, -1, axis=0)
+        self._assert_not_frozen()
+        self._lines.pop()
+        self._size -= 1
         return self
 
     def reverse(self, copy: bool = True) -> Path:
         if copy:
-            points = self.points[::-1]
-            lines = [l.reverse() for l in self.lines[::-1]]
-            constrains = self.constraints[::-1]
+            # reversing does not depend on coordinates, pending transforms are kept
             p = Path()
-            p.points = points
-            p.lines = lines
-            p.constraints = constrains
+            p.points = self._buffer[:self._size][::-1]
+            p._pending = self._pending
+            p._lines = self._lines.reversed(p)
+            p._constraints = self._constraints.reversed(p)
             return p 
         else:
-            self.points = self.points[::-1]
-            self.lines = [l.reverse(copy=False) for l in self.lines[::-1]]
-            self.constraints = self.constraints[::-1]
+            self._assert_not_frozen()
+            self._buffer[:self._size] = self._buffer[:self._size][::-1]
+            self._lines = self._lines.reversed(self)
+            self._constraints = self._constraints.reversed(self)
             return self
     
     def concat(self, path: Path, create_connecting_line: bool = False) -> Path:
-        start_end_equal = all(self.points[-1] == path.points[0])
-
-        if not start_end_equal and np.allclose(self.points[-1], path.points[0]) and not create_connecting_line:
-            print("warning small point offset. Try to fix this by translating second path ...")
-            offset = self.points[-1] - path.points[0]
-            path = path.transform(create_transform(mat_shift(dx=offset[0], dy=offset[1])))
-            start_end_equal = all(self.points[-1] == path.points[0])
-            if not start_end_equal:
-                raise PathConcatError("warning: translating path to fix small offset error did not work.")
-
-
-        if not create_connecting_line and not start_end_equal:
-            raise PathConcatError(f"Paths do not have matching end-start points and create_connecting_line is false. {self.points[-1]} !- {path.points[0]}", self, path)
-
-        p1: Path = self.copy()
-        p2: Path = path.copy()
-        if not start_end_equal:
-            p1.line_to(p2.points[0])
-
-        # path p1 and p2 have now an equal start/end  (reuse copy p1)
-        p1.points = np.append(p1.points, p2.points[1:], axis=0)
-        p1.lines  = [*p1.lines, *p2.lines]
-        p1.constraints = [*p1.constraints, *p2.constraints]
-        return p1 
-
-
-
-
-
-
+        return Path.concat_many([self, path], create_connecting_line=create_connecting_line)
 
+    @classmethod
+    def concat_many(cls, paths: List[Path], create_connecting_line: bool|List[bool] = False, 
+                    transforms: List[NDArray|None]|None = None, reverse: List[bool]|None = None) -> Path:
+        """Concatenate `paths` into a new path. The end point of each path must match the start point of 
+        the next one, unless `create_connecting_line` is set (for all paths or per path, where the entry 
+        of the first path is ignored). Points and lines are copied once into preallocated buffers. The 
+        constraints of the given paths are taken over by line index.
+
+        Optional per path `transforms` (3x3 matrices or None) and `reverse` flags are applied while 
+        copying, as if `transform` and then `reverse` had been called on each path. The given paths are 
+        not modified, thus they may be frozen.
+        """
+        if len(paths) == 0:
+            raise ValueError("expected at least one path to concatenate.")
+        if isinstance(create_connecting_line, bool):
+            create_connecting_line = [create_connecting_line]*len(paths)
+        transforms = [None]*len(paths) if transforms is None else list(transforms)
+        reverse = [False]*len(paths) if reverse is None else reverse
+
+        def points_of(idx: int) -> NDArray:
+            points = paths[idx].points
+            if transforms[idx] is not None:
+                points = transform_points(points, mat=transforms[idx])
+            return points[::-1] if reverse[idx] else points
+
+        pieces: List[NDArray] = [points_of(0)]
+        connect: List[bool] = [False]
+        for idx in range(1, len(paths)):
+            points = points_of(idx)
+            connecting_line = create_connecting_line[idx]
+            end = pieces[-1][-1]
+            start_end_equal = all(end == points[0])
+
+            if not start_end_equal and np.allclose(end, points[0]) and not connecting_line:
+                print("warning small point offset. Try to fix this by translating second path ...")
+                offset = end - points[0]
+                shift = mat_shift(dx=offset[0], dy=offset[1])
+                transforms[idx] = shift if transforms[idx] is None else np.matmul(shift, transforms[idx])
+                points = points_of(idx)
+                start_end_equal = all(end == points[0])
+                if not start_end_equal:
+                    raise PathConcatError("warning: translating path to fix small offset error did not work.")
+
+            if not connecting_line and not start_end_equal:
+                raise PathConcatError(f"Paths do not have matching end-start points and create_connecting_line is false. {end} !- {points[0]}", paths[idx-1], paths[idx])
+
+            pieces.append(points)
+            connect.append(not start_end_equal)
+
+        # index of the first point of each piece in the new path. Equal start/end points are merged.
+        offsets: List[int] = [0]
+        size = len(pieces[0])
+        for points, connecting_line in zip(pieces[1:], connect[1:]):
+            offsets.append(size if connecting_line else size - 1)
+            size = offsets[-1] + len(points)
+
+        new_path = cls()
+        new_path._buffer = np.empty((max(size, cls.INITIAL_CAPACITY), 2))
+        for points, offset in zip(pieces, offsets):
+            new_path._buffer[offset:offset + len(points)] = points
+        new_path._size = size
+
+        new_path._lines.reserve(sum(len(path.lines) for path in paths) + sum(connect))
+        for path, offset, connecting_line, mat, rev in zip(paths, offsets, connect, transforms, reverse):
+            if connecting_line:
+                new_path._lines.append(offset - 1, offset)
+            line_offset = len(new_path._lines)
+            lines, constraints = path._lines, path._constraints
+            if rev:
+                lines, constraints = lines.reversed(path), constraints.reversed(path)
+            new_path._lines.extend(lines, offset)
+            new_path._constraints.extend(constraints, line_offset, transform=None if mat is None else MatrixTransform(mat))
+        if any(mat is not None for mat in transforms):
+            new_path._lines.update_geometry()
+        return new_path
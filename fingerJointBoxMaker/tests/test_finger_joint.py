@@ -1,10 +1,17 @@
 from functools import partial
+import copy
 from typing import List
 import unittest
 
 
 import sys
+import gzip
+import io
+import re
 import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import tempfile
 from matplotlib import pyplot as plt
 
 
@@ -14,11 +21,18 @@ import numpy as np
 
 from fingerJointBoxMaker.boxes.simple_box import SimpleBox, SimpleBoxStraightTop
 from fingerJointBoxMaker.boxes.stackable_box import StackableBox
-from fingerJointBoxMaker.geometry import Path, Line, PathConcatError
-from fingerJointBoxMaker.dimension import Dim
+from fingerJointBoxMaker.boxes.spec import BoxSpec
+from fingerJointBoxMaker.geometry import Path, Line, PathConcatError, Orientation, ConstraintTable, PathConsumerByTransfrom, PathConsumerReverse
+from fingerJointBoxMaker.constrains import Constraint
+from fingerJointBoxMaker.constraints_impl import PerpendicularConstraint, UserParamter, verify_constraints
+from fingerJointBoxMaker.dimension import Dim, numeric_mode
 import fingerJointBoxMaker.transform as t
-from fingerJointBoxMaker.edge import FingerJointEdge, EdgeTyp, StackableBottomTopEdge, FingerJointHolesEdge
-from fingerJointBoxMaker.face import Face
+from fingerJointBoxMaker.edge import FingerJointEdge, EdgeTyp, StackableBottomTopEdge, FingerJointHolesEdge, EdgePathCache, edge_path_cache
+from fingerJointBoxMaker.face import Face, Artifact
+from fingerJointBoxMaker.export.svgwriter import BoxDrawing, PathExporter, StreamingBoxDrawing, compact_path_data, part_key
+from fingerJointBoxMaker.export.sketch import SketchArrays
+from fingerJointBoxMaker.export.dxfwriter import DxfDrawing, polyline_runs
+from fingerJointBoxMaker.boxes.comon import add_equal_constrains_instead_of_dimensions, count_sketch_constraints, max_equal_finger_configuration, max_equal_finger_configurations, minimize_constraints
 from fingerJointBoxMaker.export.plot import plot_paths, plot_points, plot_path
 
 def line_list_to_points(lines: List[Line]):
@@ -153,6 +167,292 @@ class TestBox(unittest.TestCase):
         # self.assertEqual(edge2.finger_count.value, 4 )
         # self.assertEqual(edge2.notch_count.value, 5 )
 
+    def test_numeric_build(self):
+        b = SimpleBox.eqaul_from_finger_count(Dim(5, "l_c", ""), Dim(3, "w_c", ""), Dim(4, "h_c", ""), 10.0, Dim(3.0, "t"), Dim(0.1, "kerf"))
+        paths = b.build()
+        for p1, p2 in zip(paths, b.build(numeric=True)):
+            self.assertTrue(all(p1.points.flatten() == p2.points.flatten()))
+        # templates of numeric builds must not leak into named builds
+        for p1, p2 in zip(paths, b.build()):
+            self.assertEqual([l.dim for l in p1.lines], [l.dim for l in p2.lines])
+
+    def test_single_pass_face_build(self):
+        for face in self.box.faces:
+            builder = face.face_builder
+            self.assertTrue(all(b.composed() is not None for b in builder.path_builder))
+            sequential = Path.concat_many([b() for b in builder.path_builder])
+            path = builder.build()
+            self.assertTrue(np.array_equal(path.points, sequential.points))
+            self.assertEqual([(l.index, l.orientation, l.dim) for l in path.lines], [(l.index, l.orientation, l.dim) for l in sequential.lines])
+
+    def test_symmetric_face(self):
+        builder = self.box.bottom_top.face_builder
+        self.assertTrue(builder.symmetric)
+        symmetric = builder.build()
+        builder.symmetric = False
+        self.assertTrue(np.array_equal(symmetric.points, builder.build().points))
+
+        edge_path_cache.clear()
+        builder.symmetric = True
+        builder.build()
+        # each of the two distinct edges is built once and not copied from the cache twice
+        self.assertEqual(edge_path_cache.info().misses, 2)
+        self.assertEqual(edge_path_cache.info().hits, 0)
+
+    def test_face_build_cache(self):
+        face = self.box.bottom_top
+        path = self.box.build_face(face)
+        cached = self.box.build_face(face)
+        self.assertIsNot(path, cached)
+        self.assertFalse(cached.frozen)
+        self.assertTrue(np.array_equal(path.points, cached.points))
+        self.assertEqual(len(path.constraints), len(cached.constraints))
+        self.assertEqual(len(face._path_cache), 1)
+
+        # mutating the providers invalidates the cached path
+        face.constraint_providers.pop()
+        self.assertNotEqual(len(self.box.build_face(face).constraints), len(path.constraints))
+        # numeric builds are cached separately
+        self.box.build_face(face, numeric=True)
+        self.assertEqual(len(face._path_cache), 2)
+
+        # a provider with captured state has no key, thus the face is not cached
+        state = {"offset": 0.0}
+        def shift(path: Path, face: Face) -> Path:
+            return path.transform(t.create_transform(t.mat_shift(dx=state["offset"])))
+        face.constraint_providers.append(shift)
+        self.assertIsNone(face.cache_key())
+        first = self.box.build_face(face)
+        state["offset"] = 5.0
+        np.testing.assert_allclose(self.box.build_face(face).points, first.points + (5.0, 0.0))
+        face.constraint_providers[-1] = partial(add_equal_constrains_instead_of_dimensions)
+        self.assertIsNotNone(face.cache_key())
+        face.constraint_providers[-1] = partial(add_equal_constrains_instead_of_dimensions, face=face)
+        self.assertIsNone(face.cache_key())
+
+    def test_parallel_build(self):
+        serial = self.box.build()
+        box = pickle.loads(pickle.dumps(self.box))
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            paths = box.build(executor=executor)
+        self.assertEqual(len(paths), len(serial))
+        for p1, p2 in zip(serial, paths):
+            self.assertTrue(np.array_equal(p1.points, p2.points))
+            self.assertEqual([l.dim for l in p1.lines], [l.dim for l in p2.lines])
+            self.assertEqual([c.get_name() for c in p1.constraints], [c.get_name() for c in p2.constraints])
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            paths = box.build(numeric=True, executor=executor)
+        for p1, p2 in zip(serial, paths):
+            self.assertTrue(np.array_equal(p1.points, p2.points))
+
+    def test_concurrent_numeric_and_named_builds(self):
+        # unbuilt copies, thus each build runs the dim arithmetic
+        data = pickle.dumps(self.box)
+        serial = self.box.build()
+
+        def dims(path: Path):
+            return [None if l.dim is None else (l.dim.value, l.dim.name) for l in path.lines]
+
+        named = [dims(p) for p in serial]
+
+        def build(numeric: bool):
+            return numeric, pickle.loads(data).build(numeric=numeric)
+
+        edge_path_cache.clear()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(build, [i % 2 == 0 for i in range(30)]))
+        for numeric, paths in results:
+            for p1, p2, expected in zip(serial, paths, named):
+                self.assertTrue(np.array_equal(p1.points, p2.points))
+                if not numeric:
+                    self.assertEqual(dims(p2), expected)
+
+    def test_box_spec(self):
+        spec = BoxSpec.from_box(self.box)
+        loaded = BoxSpec.from_json(spec.to_json())
+        self.assertEqual(loaded, spec)
+        self.assertEqual(loaded.content_hash(), spec.content_hash())
+
+        box = pickle.loads(pickle.dumps(loaded.compile()))
+        for p1, p2 in zip(self.box.build(), box.build()):
+            self.assertTrue(np.array_equal(p1.points, p2.points))
+            self.assertEqual([l.dim for l in p1.lines], [l.dim for l in p2.lines])
+            self.assertEqual([c.get_name() for c in p1.constraints], [c.get_name() for c in p2.constraints])
+
+        other = SimpleBox.eqaul_from_finger_count(
+            self.length_finger_count, self.width_finger_count, self.height_finger_count, 12.0, self.thickness, Dim(0.1, "kerf"))
+        self.assertNotEqual(BoxSpec.from_box(other).content_hash(), spec.content_hash())
+
+        self.box.bottom_top.post_path_consumer.append(lambda p: p)
+        with self.assertRaises(ValueError):
+            BoxSpec.from_box(self.box)
+
+    def test_streaming_svg(self):
+        paths = self.box.build()
+        outputs = []
+        for drawing in (BoxDrawing(profile="full"), StreamingBoxDrawing(profile="full")):
+            for i, p in enumerate(paths):
+                drawing.add(p, f"face<{i}>")
+            fd = io.StringIO()
+            drawing.save(fd)
+            outputs.append(fd.getvalue())
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_minified_and_compressed_svg(self):
+        paths = self.box.build()
+        drawing = BoxDrawing(profile="full")
+        for i, p in enumerate(paths):
+            drawing.add(p, f"face{i}")
+        outputs = []
+        for d in (drawing, StreamingBoxDrawing.from_drawing(drawing)):
+            fd = io.StringIO()
+            d.save(fd, minify=True)
+            outputs.append(fd.getvalue())
+            with tempfile.TemporaryDirectory() as tmp:
+                file = os.path.join(tmp, "box.svgz")
+                d.save(file)
+                with gzip.open(file, "rt", encoding="utf-8") as zfd:
+                    outputs.append(zfd.read())
+        self.assertEqual(outputs[0], outputs[2])
+        self.assertEqual(outputs[1], outputs[3])
+        self.assertNotIn("\n  <", outputs[0])
+
+    def test_dedup_translated_parts(self):
+        path = self.box.build()[0]
+        shifted = path.transform(t.create_transform(t.mat_shift(dx=0.5, dy=100.0)))
+        self.assertEqual(part_key(path)[0], part_key(shifted)[0])
+        outputs = []
+        for drawing in (BoxDrawing(profile="full", dedup=True), StreamingBoxDrawing(profile="full", dedup=True)):
+            drawing.add(path, "a").add(shifted, "b").add(self.box.build()[1], "c")
+            self.assertEqual([(p[0], None if p[1] is None else p[1].tolist()) for p in drawing.placements()], 
+                             [(0, [0.0, 0.0]), (0, [0.5, 100.0]), (2, None)])
+            fd = io.StringIO()
+            drawing.save(fd)
+            outputs.append(fd.getvalue())
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0].count("<path"), 2)
+        self.assertIn('<use id="b" x="0.5" xlink:href="#a-part" y="100.0"/>', outputs[0])
+
+    def test_dxf_export(self):
+        paths = self.box.build()
+        runs = [r for p in paths for r in polyline_runs(p)]
+        for construction in DxfDrawing.CONSTRUCTION_MODES:
+            drawing = DxfDrawing(construction=construction)
+            for i, p in enumerate(paths):
+                drawing.add(p, f"face{i}")
+            fd = io.StringIO()
+            drawing.save(fd)
+            lines = fd.getvalue().splitlines()
+            # pairs of group code and value
+            self.assertTrue(all(code.strip().isdigit() for code in lines[::2]))
+            groups = [(int(code), value) for code, value in zip(lines[::2], lines[1::2])]
+            self.assertEqual(groups[-1], (0, "EOF"))
+            self.assertEqual(groups[2:4], [(9, "$ACADVER"), (1, "AC1009")])
+            sections = [groups[i + 1][1] for i, g in enumerate(groups) if g == (0, "SECTION")]
+            self.assertEqual(sections, ["HEADER", "TABLES", "ENTITIES"])
+            self.assertEqual(sum(g == (0, "ENDSEC") for g in groups), 3)
+            # only R12 entities, each polyline has its vertices of one run and ends with SEQEND
+            entities = [value for code, value in groups[groups.index((2, "ENTITIES")) + 1:-2] if code == 0]
+            self.assertTrue(set(entities) <= {"POLYLINE", "VERTEX", "SEQEND"})
+            polylines = " ".join(entities).replace(" VERTEX", "+").split(" SEQEND")[:-1]
+            expected = [r for r in runs if construction == "layer" or not r[1]]
+            self.assertEqual([len(p.strip()) - len("POLYLINE") for p in polylines], [len(r[0]) for r in expected])
+        self.assertGreater(sum(r[1] for r in runs), 0)
+        # all points of the outline, the start point is not repeated for a closed polyline
+        outline, _, closed = next(polyline_runs(paths[0]))
+        self.assertTrue(closed)
+        self.assertEqual(len(outline), paths[0].points.shape[0] - 1)
+
+    def test_compact_path_data(self):
+        path = self.box.build()[0]
+        data = compact_path_data(path, precision=3)
+        exporter = PathExporter()
+        exporter.parse_box_path(path)
+        self.assertLess(2 * len(data), len(" ".join(exporter.p)))
+        # decode the commands back to the line end points
+        pos, ends = None, []
+        for cmd, args in re.findall(r"([MmLlHhVv])([^MmLlHhVv]*)", data):
+            values = [float(v) for v in args.split()]
+            if pos is None:
+                pos = np.array(values)
+                continue
+            if cmd in "Hh":
+                values = [values[0], 0.0 if cmd == "h" else pos[1]]
+            elif cmd in "Vv":
+                values = [0.0 if cmd == "v" else pos[0], values[0]]
+            pos = pos + values if cmd.islower() else np.array(values)
+            ends.append(pos)
+        expected = path.points[path.lines.columns()["end"]]
+        np.testing.assert_allclose(np.array(ends), expected, atol=1e-3)
+
+    def test_build_for_exporter(self):
+        paths = self.box.build_for(BoxDrawing())
+        self.assertTrue(all(len(p.constraints) == 0 for p in paths))
+        self.assertTrue(all(len(p.constraints) > 0 for p in self.box.build()))
+        # sketch offset is a cad artifact
+        self.assertEqual(paths[1].line_count + 1, self.box.build_face(self.box.front_back, artifacts=Artifact.ALL).line_count)
+
+    def test_minimize_constraints(self):
+        # opt-in, the default constraints are not reduced
+        self.assertNotIn(minimize_constraints, self.box.bottom_top.constraint_providers)
+        before = self.box.build_face(self.box.bottom_top)
+        self.box.with_minimized_constraints()
+        path = self.box.build_face(self.box.bottom_top)
+        reduction = self.box.bottom_top.constraint_reduction
+        self.assertEqual(reduction.before, count_sketch_constraints(before))
+        self.assertEqual(reduction.after, count_sketch_constraints(path))
+        self.assertGreater(reduction.removed, 0)
+        # nothing is redundant: the constraint equations (the origin lock fixes two coordinates) equal 
+        # the degrees of freedom of the closed outline
+        self.assertEqual(reduction.after + 1, 2 * len(np.unique(path.points, axis=0)))
+        self.assertGreater(reduction.before + 1, 2 * len(np.unique(path.points, axis=0)))
+        self.assertEqual(len(verify_constraints(path)), 0)
+        # one orientation constraint per line, the perpendicular constraints link all lines including the first
+        names = [c.get_name() for c in path.constraints]
+        self.assertEqual(names.count(Constraint.Perpendicular), path.line_count - 1)
+        self.assertEqual(names.count(Constraint.Horizontal) + names.count(Constraint.Vertical), 1)
+        # the closed outline fixes the length of one horizontal and one vertical line
+        self.assertEqual(sum(l.dim is None for l in path.lines), 2 + sum(len(c.lines) for c in path.constraints if c.get_name() == Constraint.EqualConstraint))
+        # running it again removes nothing
+        minimize_constraints(path, self.box.bottom_top)
+        self.assertEqual(self.box.bottom_top.constraint_reduction.removed, 0)
+
+    def test_verify_constraints(self):
+        for path in self.box.build():
+            self.assertEqual(len(verify_constraints(path)), 0)
+
+        path = self.box.build_face(self.box.bottom_top)
+        path.points[3] += (0.5, 0)
+        violated = verify_constraints(path)
+        self.assertGreater(len(violated), 0)
+        for i in violated:
+            self.assertTrue(any(l.index in (2, 3) for l in path.constraints[i].get_lines()))
+
+        # object constraints are not checked, also without lines
+        path = Path.zero()
+        path.append_constraint(UserParamter(Dim(3.0, "t")))
+        self.assertEqual(path.line_count, 0)
+        self.assertEqual(len(verify_constraints(path)), 0)
+
+    def test_sketch_arrays(self):
+        path = self.box.build_face(self.box.front_back)
+        sketch = SketchArrays.from_path(path, self.box.constraints)
+        self.assertEqual(sketch.lines.shape, (path.line_count, 2))
+        self.assertEqual(len(sketch.constraint_types), len(path.constraints))
+        self.assertEqual(list(sketch.parameter_names), [p.dim.name for p in self.box.constraints])
+        perpendicular = ConstraintTable.code_of(PerpendicularConstraint)
+        self.assertTrue(np.all(sketch.constraint_arity[sketch.constraint_types == perpendicular] == 2))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            file = os.path.join(tmp, "sketch.npz")
+            sketch.save(file)
+            for mmap in (True, False):
+                loaded = SketchArrays.load(file, mmap=mmap)
+                self.assertEqual(isinstance(loaded.points, np.memmap), mmap)
+                for name, a, b in zip(sketch._fields, sketch, loaded):
+                    self.assertTrue(np.array_equal(a, b, equal_nan=a.dtype.kind == "f"), name)
+                del loaded
+
 class TestDimensions(unittest.TestCase):
 
     def test_dim_arithmetic_int(self):
@@ -258,6 +558,44 @@ class TestDimensions(unittest.TestCase):
             self.assertTrue("/" in e.args[0])
             self.assertTrue("mm != m" in e.args[0])
 
+    def test_expression_nodes(self):
+        d1 = Dim(1.0, "d1", "mm")
+        d2 = Dim(2.0, "d2", "mm")
+        e1 = (d1 - d2) + d1.div_by(2)
+        e2 = (Dim(1.0, "d1") - Dim(2.0, "d2")) + Dim(1.0, "d1").div_by(2)
+        # equal expressions share the same node
+        self.assertIs(e1.node, e2.node)
+        self.assertEqual(e1.name, "(d1 - d2) + d1/2")
+        self.assertEqual(e1.abs_hash, e2.abs_hash)
+        self.assertEqual(hash(e1.abs_hash), hash(e2.abs_hash))
+        self.assertIs(copy.deepcopy(e1).node, e1.node)
+
+    def test_abs_hash_of_expressions(self):
+        a = Dim(1.0, "a")
+        b = Dim(2.0, "b")
+        # arithmetic with numbers keeps the expression node
+        self.assertIs((-(a + b)).node, (a + b).node)
+        self.assertEqual((-(a + b)).abs_hash, (a + b).abs_hash)
+        # a name given as string equals the same expression built by arithmetic
+        self.assertEqual(Dim(3.0, "a + b").abs_hash, (a + b).abs_hash)
+        self.assertEqual(hash(Dim(3.0, "a + b").abs_hash), hash((a + b).abs_hash))
+        # negated notches of a kerf corrected holes edge are equal to the other notches
+        e = FingerJointEdge.as_length(Dim(10, "finger"), Dim(4, "finger_c"), Dim(10, "notch"), Dim(5, "notch_c"), Dim(3, "t"), Dim(0.1, "kerf"))
+        path = add_equal_constrains_instead_of_dimensions(e.as_holes_edge().make_path(), None)
+        self.assertEqual(sorted(len(c.lines) for c in path.constraints if c.get_name() == Constraint.EqualConstraint), [9, 9])
+
+    def test_numeric_mode(self):
+        d1 = Dim(1.0, "d1", "mm")
+        d2 = Dim(2.0, "d2", "mm")
+        with numeric_mode():
+            d3 = (d1 + d2).div_by(2)
+        self.assertEqual(d3, Dim(1.5, "", "mm"))
+        with numeric_mode():
+            # arithmetic with numbers does not render or keep names either
+            self.assertEqual([(d1 * 2).name, (2 - d1).name, (-d1).name, (d1 / 2).name], ["", "", "", ""])
+        self.assertEqual((d1 + d2).div_by(2), Dim(1.5, "d1 + d2/2", "mm"))
+
+
 class TestEdge(unittest.TestCase):
 
     def test_edge_shift_rot(self):
@@ -277,6 +615,75 @@ class TestEdge(unittest.TestCase):
         points3 = np.array([25, 0, 25, 10, 22, 10, 22, 15, 25, 15, 25, 25])
         self.assertTrue(all(path3.points.flatten() == points3))
 
+    def test_lazy_transform(self):
+        e: FingerJointEdge = FingerJointEdge.as_length(Dim(10, "finger"), Dim(2, "finger_c"), Dim(5, "notch"), Dim(1, "notch_c"), Dim(3, "thickness"))
+        path1 = e.make_path()
+        path2 = path1.transform(t.create_transform(t.mat_rot_90), copy=False)
+        self.assertIs(path1, path2)
+        path2.transform(t.create_transform(t.mat_shift(dx=e.length)), copy=False).reverse(copy=False)
+        self.assertIsNotNone(path2._pending)
+
+        # composed transforms are applied once on read
+        points = np.array([25, 25, 25, 15, 22, 15, 22, 10, 25, 10, 25, 0])
+        self.assertTrue(all(path2.points.flatten() == points), path2.points.flatten())
+        self.assertIsNone(path2._pending)
+        self.assertEqual(path2.lines[0].orientation, Orientation.Vertical)
+        self.assertTrue(all(line_list_to_points(path2.lines).flatten() == points))
+
+        # appending to a path with pending transform
+        path3 = e.make_path().transform(t.create_transform(t.mat_rot_90)).line_to(0., 30.)
+        self.assertTrue(all(path3.points[-2:].flatten() == np.array([0, 25, 0, 30])), path3.points.flatten())
+
+        # path consumers return copies unless they are told to work in place
+        path4 = e.make_path()
+        points = np.array(path4.points)
+        for consumer in (PathConsumerByTransfrom.from_mat(t.mat_rot_90), PathConsumerReverse()):
+            self.assertIsNot(consumer(path4), path4)
+            self.assertTrue(np.array_equal(path4.points, points))
+        self.assertIs(PathConsumerByTransfrom.from_mat(t.mat_rot_90, copy=False)(path4), path4)
+
+    def test_build_path_vectorized(self):
+        e: FingerJointEdge = FingerJointEdge.as_length(Dim(10, "finger"), Dim(4, "finger_c"), Dim(5, "notch"), Dim(3, "notch_c"), Dim(2, "thickness"))
+        edges = [e, e.as_negative(), FingerJointEdge.create_III(Dim(50., "l"), Dim(5.5, "a"), Dim(3., "t"), 5, kerf=Dim(0.1, "kerf"))]
+        edges.extend([_e.as_negative() for _e in edges[2:]])
+        for _e in edges:
+            p1 = _e.build_path(Path.zero())
+            p2 = _e.build_path_sequential(Path.zero())
+            self.assertTrue(all(p1.points.flatten() == p2.points.flatten()))
+            self.assertEqual(p1.line_count, p2.line_count)
+            for l1, l2 in zip(p1.lines, p2.lines):
+                self.assertEqual(l1.dim, l2.dim)
+                self.assertEqual(l1.orientation, l2.orientation)
+
+    def test_build_holes_vectorized(self):
+        e: FingerJointEdge = FingerJointEdge.create_I(Dim(50., "l"), Dim(5.5, "a"), Dim(3., "t"), 5, kerf=Dim(0.1, "kerf"))
+        for _e in [e.as_holes_edge(), e.as_negative().as_holes_edge()]:
+            p1 = _e.build_path(Path.zero())
+            p2 = _e.build_path_sequential(Path.zero())
+            self.assertTrue(all(p1.points.flatten() == p2.points.flatten()))
+            self.assertTrue(all(p1.lines.construction == p2.lines.construction))
+            self.assertEqual([l.dim for l in p1.lines], [l.dim for l in p2.lines])
+
+    def test_edge_path_cache(self):
+        cache = EdgePathCache(maxsize=1)
+        e1: FingerJointEdge = FingerJointEdge.as_length(Dim(10, "finger"), Dim(2, "finger_c"), Dim(5, "notch"), Dim(1, "notch_c"), Dim(3, "thickness"))
+        e2: FingerJointEdge = FingerJointEdge.as_length(Dim(10, "finger"), Dim(2, "finger_c"), Dim(5, "notch"), Dim(1, "notch_c"), Dim(3, "thickness"))
+
+        template = cache.get(e1)
+        self.assertIs(cache.get(e2), template)
+        self.assertTrue(template.frozen)
+        self.assertRaises(ValueError, template.h, 1.)
+        self.assertTrue(all(template.points.flatten() == e1.make_path(use_cache=False).points.flatten()))
+
+        cache.get(e1.as_negative())
+        self.assertEqual(cache.info(), (1, 2, 1, 1, 1))
+
+        # paths handed out by make_path are mutable copies
+        path = e1.make_path()
+        self.assertFalse(path.frozen)
+        path.h(1.)
+        self.assertEqual(len(e1.make_path()), len(path) - 1)
+
     def test_path_concat_1(self):
         p1 = Path.zero()
         p2 = Path().add_point(1, 1)
@@ -308,6 +715,47 @@ class TestEdge(unittest.TestCase):
         self.assertTrue(all(np.array([3., 4., 1., 2., 0., 0.]) == line_list_to_points(p1.lines).flatten()), line_list_to_points(p1.lines).flatten())
 
 
+    def test_point_buffer_growth(self):
+        p1 = Path.zero()
+        for i in range(1, 2*Path.INITIAL_CAPACITY + 1):
+            p1.line_to(float(i), float(i % 2))
+        self.assertEqual(len(p1), 2*Path.INITIAL_CAPACITY + 1)
+        self.assertGreaterEqual(p1.capacity, len(p1))
+        self.assertTrue(all(p1.points[:, 0] == np.arange(len(p1))))
+        self.assertTrue(all(line_list_to_points(p1.lines).flatten() == p1.points.flatten()))
+
+        p1.remove_last_line()
+        p1.line_to(0., 5.)
+        self.assertTrue(all(np.array([0., 5.]) == p1.points[-1]), p1.points[-1])
+
+    def test_line_table(self):
+        p1 = Path.zero().h_dim(Dim(5, "d1")).v(2).h(-5).line_to(1, 0)
+        self.assertEqual(p1.line_count, 4)
+        self.assertTrue(all(p1.lines.start == np.arange(4)))
+        self.assertTrue(all(p1.lines.end == np.arange(1, 5)))
+        self.assertEqual(p1.lines[0].orientation, Orientation.Horizontal)
+        self.assertEqual(p1.lines[1].orientation, Orientation.Vertical)
+        self.assertEqual(p1.lines[1].level, 5.)
+        self.assertEqual(p1.lines[-1].orientation, Orientation.Other)
+        self.assertEqual(p1.lines[0].dim, Dim(5, "d1"))
+
+        # views write through to the table
+        p1.as_construciont_line()
+        self.assertTrue(p1.lines.construction[-1])
+        p1.lines[0].dim = None
+        self.assertIsNone(p1.lines.dims[0])
+
+        lines = p1.get_lines_at_level(0., Orientation.Horizontal)
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(all(lines[0].end == np.array([5., 0.])))
+
+        # transform updates orientation and level of lines
+        p2 = p1.transform(t.create_transform(t.mat_rot_90))
+        self.assertEqual(p2.lines[0].orientation, Orientation.Vertical)
+        self.assertEqual(p2.lines[1].orientation, Orientation.Horizontal)
+        self.assertEqual(p2.lines[1].level, 5.)
+        self.assertEqual(p1.lines[0].orientation, Orientation.Horizontal)
+
     def test_closed(self):
         p1 = Path.zero()
         p1.line_to(2,2)
@@ -335,6 +783,45 @@ class TestEdge(unittest.TestCase):
         self.assertEqual(p3.lines[2].dim, Dim(-5, "d2"))
 
 
+    def test_concat_many(self):
+        p1 = Path.zero().line_to(5, 5).h_dim(Dim(5, "d1"))
+        p2 = Path().add_point(10, 5).v_dim(Dim(-5, "d2"))
+        p3 = Path().add_point(12, 0).line_to(12, -2)
+        p4 = Path.concat_many([p1, p2, p3], create_connecting_line=[False, False, True])
+        points = np.array([0, 0, 5, 5, 10, 5, 10, 0, 12, 0, 12, -2])
+        self.assertTrue(all(points == p4.points.flatten()), p4.points.flatten())
+        self.assertTrue(all(points == line_list_to_points(p4.lines).flatten()))
+        self.assertEqual(p4.lines[1].dim, Dim(5, "d1"))
+        self.assertEqual(p4.lines[2].dim, Dim(-5, "d2"))
+        self.assertIsNone(p4.lines[3].dim)
+        # inputs are not modified
+        self.assertEqual(len(p1), 3)
+        self.assertEqual(p2.line_count, 1)
+
+        self.assertRaises(PathConcatError, Path.concat_many, [p1, p2, p3])
+
+    def test_constraint_table(self):
+        p1 = Path.zero().h(5.).v(5.).h(-5.)
+        p1.append_constraint(PerpendicularConstraint(p1.lines[0], p1.lines[1]), UserParamter(Dim(5, "d")))
+        p1.constraints.add_many(PerpendicularConstraint, [[1, 2]])
+        self.assertEqual(len(p1.constraints), 3)
+        self.assertTrue(all(p1.constraints.codes[[0, 2]] >= 0))
+        self.assertEqual(p1.constraints.codes[1], ConstraintTable.OBJECT)
+
+        # constraints refer to lines of the transformed path
+        p2 = p1.transform(t.create_transform(t.mat_shift(dx=1.)))
+        c: PerpendicularConstraint = p2.constraints[0]
+        self.assertTrue(all(c.l1.start == np.array([1., 0.])))
+        self.assertIsInstance(p2.constraints[1], UserParamter)
+
+        p3 = Path.zero().h(-1.).concat(p1.transform(t.create_transform(t.mat_shift(dx=-1.))))
+        self.assertEqual([c.get_name() for c in p3.constraints], [Constraint.Perpendicular, Constraint.UserParameter, Constraint.Perpendicular])
+        self.assertEqual([l.index for l in p3.constraints[2].get_lines()], [2, 3])
+
+        p4 = p1.reverse()
+        self.assertEqual([l.index for l in p4.constraints[0].get_lines()], [1, 0])
+        self.assertTrue(all(p4.constraints[2].l1.end == np.array([0., 0.])))
+
     def test_path_concat(self):
         e1: FingerJointEdge = FingerJointEdge.as_length(Dim(10, "finger1"), Dim(2, "finger1_c"), Dim(5, "notch1"), Dim(1, "notch1_c"), Dim(3, "thickness"))
         e2: FingerJointEdge = FingerJointEdge.as_width(Dim(5, "finger2"), Dim(3, "finger2_c"), Dim(5, "notch"), Dim(2, "notch_c"), Dim(3, "thickness"))
@@ -401,6 +888,29 @@ class TestEdge(unittest.TestCase):
 
 
 
+class TestFingerConfiguration(unittest.TestCase):
+
+    def test_batch_equals_scalar(self):
+        lengths = np.arange(0., 120., 0.7)
+        max_fingers = np.arange(len(lengths)) % 7
+        x, count = max_equal_finger_configurations(lengths, max_fingers, thickness=3.0)
+        self.assertEqual(x.shape, lengths.shape)
+        for i, (length, max_finger) in enumerate(zip(lengths, max_fingers)):
+            try:
+                expected = max_equal_finger_configuration(length, int(max_finger), thickness=3.0)
+            except ValueError:
+                self.assertTrue(x.mask[i])
+                self.assertTrue(count.mask[i])
+                continue
+            self.assertFalse(x.mask[i])
+            self.assertEqual((x[i], count[i]), expected)
+
+    def test_broadcast(self):
+        x, count = max_equal_finger_configurations([[100.], [200.]], [3, 4], thickness=[3., 4.])
+        self.assertEqual(x.shape, (2, 2))
+        self.assertEqual(count[1][1], 4)
+        self.assertEqual(x[1][1], 200./7)
+
 
 def test_path_building():
     b = SimpleBox.eqaul_from_finger_count(
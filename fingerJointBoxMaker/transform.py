@@ -1,5 +1,5 @@
 import numpy as np
-from functools import partial, reduce
+from functools import reduce
 from fingerJointBoxMaker.constrains import Transform
 
 
@@ -50,15 +50,26 @@ def mat_shift(dx: float = 0., dy: float= 0.) -> np.array:
         [0, 0, 1]
     ])
 
+class MatrixTransform:
+    """Transform given by a 3x3 matrix in homogeneous coordinates. The matrix is exposed 
+    as `mat` such that consecutive transforms can be composed before they are applied."""
+
+    def __init__(self, mat: np.array) -> None:
+        self.mat: np.array = mat
+
+    def __call__(self, points: np.array) -> np.array:
+        return transform_points(points, mat=self.mat)
+
+
 def create_transform(*mat: np.array) -> Transform:
     if len(mat) > 1:
         mat = reduce(np.matmul, mat)
     else:
         mat = mat[0]
-    return partial(transform_points, mat=mat)
+    return MatrixTransform(mat)
 
 def _reflect_on_x_axis() -> Transform:
-    return partial(transform_points, mat=mat_reflect_x)
+    return MatrixTransform(mat_reflect_x)
 
 
 